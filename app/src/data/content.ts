@@ -5,11 +5,13 @@
 // Switch between static (build-time) and live (client-side glob) content here
 // import { duas as extractedDuas, aamal as extractedAamal } from './ramadan_extracted';
 import { duas as liveDuas, aamal as liveAamal } from './live_content';
+import calendarEventsRaw from './calendar_events.json';
 
 export const duas = liveDuas;
 export const aamal = liveAamal;
 
 export interface CalendarEvent {
+  id: string;
   date: number;
   title: string;
   arabicTitle?: string;
@@ -35,49 +37,9 @@ export interface AkhlaqPoint {
   day: number;
 }
 
-export const calendarEvents: CalendarEvent[] = [
-  // From Mafatih al-Jinan - Ramadan Calendar (Level 1: Essential)
-  {
-    date: 10,
-    title: 'Passing of Khadijah al-Kubra (as)',
-    arabicTitle: 'وفاة خديجة الكبرى عليها السلام',
-    description: 'The passing of Khadijah al-Kubra (peace be upon her) in the tenth year of the Prophetic mission.',
-    type: 'martyrdom',
-    level: 1
-  },
-  {
-    date: 15,
-    title: 'Birth of Imam Hasan al-Mujtaba (as)',
-    arabicTitle: 'ولادة الإمام الحسن المجتبى عليه السلام',
-    description: 'The birth of the Prophet\'s (peace and blessings be upon him and his progeny) eldest grandson, al-Hasan al-Mujtaba (peace be upon him), in the third year of the Hijra.',
-    type: 'birth',
-    level: 1
-  },
-  {
-    date: 17,
-    title: 'Victory of the Battle of Badr',
-    arabicTitle: 'انتصار المسلمين في معركة بدر',
-    description: 'The victory of the Muslims in the Battle of Badr in the second year of the Hijra.',
-    type: 'occasion',
-    level: 1
-  },
-  {
-    date: 19,
-    title: 'Wounding of Imam Ali (as)',
-    arabicTitle: 'جرح أميرالمؤمنين عليه السلام',
-    description: 'The wounding of the Commander of the Faithful (peace be upon him) at the hands of Ibn Muljam, in the 40th year of the Hijra.',
-    type: 'martyrdom',
-    level: 1
-  },
-  {
-    date: 21,
-    title: 'Martyrdom of Imam Ali (as)',
-    arabicTitle: 'شهادة أميرالمؤمنين عليّ بن أبي طالب عليه السلام',
-    description: 'The martyrdom of the Master of the Pious, the Commander of the Faithful Ali ibn Abi Talib (peace be upon him), in the 40th year of the Hijra, which saddened the Islamic world.',
-    type: 'martyrdom',
-    level: 1
-  }
-];
+// From Mafatih al-Jinan - Ramadan Calendar. Edited with tools/calendar_events.py or the
+// tools/calendar_event_editor.py GUI, which validate what the loose JSON import types cannot
+export const calendarEvents = calendarEventsRaw as unknown as CalendarEvent[];
 
 
 export const fiqhPoints: FiqhPoint[] = [
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the data generation pipeline.
+
+Builds synthetic corpora at multiples of the real ones (DuaAmaal/*.json
+and the Common Acts items of common_acts_ramadan.json), runs them through
+the same code the generators use and times each stage:
+
+    load       parse the DuaAmaal files and the Common Acts file
+    normalise  DuaAmaal documents -> Dua/Aamal (models.item_from_source)
+    segment    Common Acts items -> duas (classification and grouping)
+    dedupe     the content-digest duplicate check inside segmentation
+    emit       write both TypeScript modules
+
+For every stage it reports items/sec and the peak RSS reached so far, plus
+the bytes of TypeScript emitted. Each scale runs in its own process so the
+RSS figures do not carry over between scales. Results are written as JSON
+(benchmarks/results/<timestamp>.json by default) so runs can be compared:
+
+Usage:
+    python benchmarks/run.py                       # 10x, 100x and 1000x
+    python benchmarks/run.py --scales 10 100       # just these multiples
+    python benchmarks/run.py --compare benchmarks/results/20261017T120000Z.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+DEFAULT_SCALES = (10, 100, 1000)
+STAGES = ("load", "normalise", "segment", "dedupe", "emit")
+
+sys.path.insert(0, str(PROJECT_ROOT / "tools"))
+import generate_ramadan_data  # noqa: E402
+from generate_data import iter_typescript  # noqa: E402
+from item_classifier import ItemClassifier  # noqa: E402
+from models import item_from_source  # noqa: E402
+from ts_emitter import write_chunks  # noqa: E402
+
+# Every DUPLICATE_EVERY-th copy of the Common Acts repeats copy 0 verbatim,
+# so the dedupe stage has real duplicates to drop
+DUPLICATE_EVERY = 4
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# -- Synthetic corpora ---------------------------------------------------------
+
+def write_dua_amaal(out_dir: Path, scale: int) -> int:
+    """Write ``scale`` renamed copies of every DuaAmaal file; returns the file count."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for json_file in sorted((PROJECT_ROOT / "DuaAmaal").glob("*.json")):
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for copy in range(scale):
+            doc = {**data, "id": f"{data.get('id', json_file.stem)}-{copy}"}
+            with open(out_dir / f"{json_file.stem}-{copy}.json", "w", encoding="utf-8") as f:
+                json.dump(doc, f, indent=2, ensure_ascii=False)
+            count += 1
+    return count
+
+
+def write_common_acts(path: Path, scale: int) -> int:
+    """Write the Common Acts items repeated ``scale`` times; returns the item count."""
+    with open(PROJECT_ROOT / "common_acts_ramadan.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+    items = []
+    for copy in range(scale):
+        # Numbered copies are distinct duas; the others repeat copy 0
+        suffix = "" if copy % DUPLICATE_EVERY == 0 else f" {copy}"
+        for item in data["content"]["items"]:
+            items.append({
+                **item,
+                "id": len(items),
+                "arabic": item.get("arabic", "") + suffix if item.get("arabic") else "",
+                "english": item.get("english", "") + suffix,
+            })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**data, "content": {**data["content"], "items": items}}, f, ensure_ascii=False)
+    return len(items)
+
+
+# -- Stages -------------------------------------------------------------------
+
+class Stages:
+    """Collects wall time, item counts and peak RSS per stage."""
+
+    def __init__(self):
+        self.results: dict[str, dict] = {}
+
+    @contextmanager
+    def stage(self, name: str, items: int):
+        start = time.perf_counter()
+        yield
+        self.record(name, time.perf_counter() - start, items)
+
+    def record(self, name: str, seconds: float, items: int):
+        self.results[name] = {
+            "seconds": round(seconds, 6),
+            "items": items,
+            "items_per_sec": round(items / seconds, 1) if seconds else None,
+            "peak_rss": peak_rss(),
+        }
+
+
+@contextmanager
+def timed_digests(totals: dict):
+    """Accumulate the time spent in generate_ramadan_data.content_digest."""
+    original = generate_ramadan_data.content_digest
+
+    def content_digest(dua):
+        start = time.perf_counter()
+        try:
+            return original(dua)
+        finally:
+            totals["seconds"] += time.perf_counter() - start
+            totals["calls"] += 1
+
+    generate_ramadan_data.content_digest = content_digest
+    try:
+        yield totals
+    finally:
+        generate_ramadan_data.content_digest = original
+
+
+def run_scale(scale: int) -> dict:
+    """Build the corpora for one scale and time every stage on them."""
+    stages = Stages()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        n_files = write_dua_amaal(tmp / "DuaAmaal", scale)
+        n_items = write_common_acts(tmp / "common_acts_ramadan.json", scale)
+        json_files = sorted((tmp / "DuaAmaal").glob("*.json"))
+
+        with stages.stage("load", n_files + n_items):
+            docs = []
+            for json_file in json_files:
+                with open(json_file, "r", encoding="utf-8") as f:
+                    docs.append((json_file.stem, json.load(f)))
+            with open(tmp / "common_acts_ramadan.json", "r", encoding="utf-8") as f:
+                items = json.load(f)["content"]["items"]
+
+        with stages.stage("normalise", n_files):
+            normalised = [item_from_source(data, stem).to_dict() for stem, data in docs]
+        del docs
+
+        digests = {"seconds": 0.0, "calls": 0}
+        start = time.perf_counter()
+        with timed_digests(digests), open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            duas = generate_ramadan_data.segment_common_acts(items, ItemClassifier())
+        elapsed = time.perf_counter() - start
+        stages.record("segment", elapsed - digests["seconds"], n_items)
+        stages.record("dedupe", digests["seconds"], digests["calls"])
+        del items
+
+        duas_ts = tmp / "out" / "duas.ts"
+        common_acts_ts = tmp / "out" / "common_acts.ts"
+        duas_ts.parent.mkdir()
+        with stages.stage("emit", len(normalised) + len(duas)):
+            write_chunks(duas_ts, iter_typescript(
+                [item for item in normalised if item["type"] == "dua"],
+                [item for item in normalised if item["type"] == "aamal"],
+            ))
+            with open(common_acts_ts, "w", encoding="utf-8") as f:
+                f.write(generate_ramadan_data.render_typescript(duas))
+        output_bytes = duas_ts.stat().st_size + common_acts_ts.stat().st_size
+
+    return {
+        "scale": scale,
+        "dua_amaal_files": n_files,
+        "common_acts_items": n_items,
+        "duas_segmented": len(duas),
+        "duplicates_dropped": digests["calls"] - len(duas),
+        "output_bytes": output_bytes,
+        "peak_rss": peak_rss(),
+        "stages": stages.results,
+    }
+
+
+# -- Runner -------------------------------------------------------------------
+
+def run_in_subprocess(scale: int) -> dict:
+    """Run one scale in a fresh interpreter, so its peak RSS is its own."""
+    proc = subprocess.run(
+        [sys.executable, __file__, "--worker", str(scale)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def git_revision() -> str | None:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip()
+
+
+def print_result(result: dict):
+    print(f"\n{result['scale']}x: {result['dua_amaal_files']} DuaAmaal files, "
+          f"{result['common_acts_items']} Common Acts items -> {result['duas_segmented']} duas "
+          f"({result['duplicates_dropped']} duplicates dropped), "
+          f"{result['output_bytes'] / 2**20:.1f} MiB of TypeScript")
+    print(f"  {'stage':<10} {'items':>8} {'seconds':>9} {'items/s':>11} {'peak RSS MiB':>13}")
+    for name in STAGES:
+        stage = result["stages"][name]
+        rate = f"{stage['items_per_sec']:.0f}" if stage["items_per_sec"] else "-"
+        print(f"  {name:<10} {stage['items']:>8} {stage['seconds']:>9.3f} {rate:>11} "
+              f"{stage['peak_rss'] / 2**20:>13.1f}")
+
+
+def compare(results: list[dict], baseline: dict):
+    """Print each stage's time relative to the same stage and scale of ``baseline``."""
+    previous = {result["scale"]: result for result in baseline["results"]}
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'} ({baseline.get('timestamp')}):")
+    print(f"  {'scale':>6} {'stage':<10} {'before s':>9} {'after s':>9} {'change':>8}")
+    for result in results:
+        old = previous.get(result["scale"])
+        if old is None:
+            continue
+        for name in STAGES:
+            before = old["stages"].get(name, {}).get("seconds")
+            after = result["stages"][name]["seconds"]
+            change = f"{(after - before) / before:+.0%}" if before else "-"
+            print(f"  {result['scale']:>5}x {name:<10} {before or 0:>9.3f} {after:>9.3f} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data generation pipeline on synthetic corpora")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES), metavar="N",
+                        help="Multiples of the real corpus sizes to run (default: 10 100 1000)")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, metavar="RESULTS", help="Earlier results file to compare against")
+    parser.add_argument("--worker", type=int, metavar="SCALE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        json.dump(run_scale(args.worker), sys.stdout)
+        return
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    results = []
+    for scale in args.scales:
+        print(f"Running {scale}x ...", flush=True)
+        result = run_in_subprocess(scale)
+        print_result(result)
+        results.append(result)
+
+    report = {
+        "timestamp": timestamp,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,34 +4,29 @@ Extract the Ramadan Calendar section from shahr_ramadan_translated.json
 """
 
 import json
+import sys
 from pathlib import Path
 
-def extract_calendar_section():
-    # Load the main JSON file
-    input_path = Path(__file__).parent.parent / "shahr_ramadan_translated.json"
-    output_path = Path(__file__).parent.parent / "ramadan_calendar.json"
-    
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Find the calendar sub-section
-    calendar_section = None
-    content_items = data.get('content', {}).get('items', [])
-    
-    for item in content_items:
-        if isinstance(item, dict) and item.get('title') == 'تقويم هذا الشهر:':
-            calendar_section = item
-            break
-    
-    if not calendar_section:
-        print("Calendar section not found!")
-        return
-    
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+from footnotes import FootnoteTable  # noqa: E402
+from keyword_matcher import EVENT_VERBS, day_from_header  # noqa: E402
+from title_index import TitleIndex, load_pointer  # noqa: E402
+
+CALENDAR_TITLE = 'تقويم هذا الشهر:'
+
+def build_calendar(metadata, calendar_section, footnotes):
+    """
+    Pair the calendar's date headers with their event descriptions.
+
+    Events list the ids of their footnotes, linked through ``footnotes``
+    (a FootnoteTable with no other references); the texts of the linked
+    footnotes are written once, to the output's top-level ``footnotes``.
+    """
     # Create the output structure
     output_data = {
         "metadata": {
-            "source": data["metadata"]["source"],
-            "author": data["metadata"]["author"],
+            "source": metadata["source"],
+            "author": metadata["author"],
             "section": "تقويم شهر رمضان المبارك",
             "section_english": "Calendar of the Blessed Month of Ramadan",
             "description": "Important dates and events during the month of Ramadan"
@@ -44,25 +39,18 @@ def extract_calendar_section():
             "events": []
         }
     }
-    
+
     # Extract calendar events (dates and their descriptions)
     # We want to pair date headers with their event descriptions
     items = calendar_section.get('items', [])
     current_date = None
-    
+
     for item in items:
         arabic_text = item.get('arabic', '')
         
-        # Check if this is a date header (contains "من رمضان" or day ordinals)
-        is_date_header = any(keyword in arabic_text for keyword in [
-            'العاشر من رمضان',
-            'الخامس عشر من رمضان',
-            'السابع عشر',
-            'التاسع عشر',
-            'الحادي والعشرون'
-        ])
-        
-        if is_date_header:
+        # A date header is an ordinal day on its own ("السابع عشر:"),
+        # optionally followed by "من رمضان"
+        if day_from_header(arabic_text) is not None:
             current_date = {
                 "date_arabic": arabic_text,
                 "date_english": item.get('english', ''),
@@ -73,15 +61,35 @@ def extract_calendar_section():
         elif current_date and item.get('content_type') == 'commentary':
             # This is an event description for the current date
             # Skip if it's clearly not a calendar event (longer commentary text)
-            if 'وفاة' in arabic_text or 'ولادة' in arabic_text or 'شهادة' in arabic_text or 'جرح' in arabic_text or 'انتصار' in arabic_text:
+            if EVENT_VERBS.matches(arabic_text):
                 event = {
                     "id": item.get('id'),
                     "arabic": arabic_text,
                     "english": item.get('english', ''),
                     "transliteration": item.get('transliteration', ''),
-                    "footnote_refs": item.get('footnote_refs', [])
+                    "footnoteIds": footnotes.link(item.get('id'), item.get('footnote_refs') or [])
                 }
                 current_date["events"].append(event)
+
+    output_data["footnotes"] = footnotes.to_dict()["footnotes"]
+    return output_data
+
+
+def extract_calendar_section():
+    input_path = Path(__file__).parent.parent / "shahr_ramadan_translated.json"
+    output_path = Path(__file__).parent.parent / "ramadan_calendar.json"
+    
+    # Look the calendar up in the cached title index and stream just that
+    # section (and the metadata at the top of the file) from the source
+    metadata = load_pointer(input_path, '/metadata') or {}
+    pointer = TitleIndex.for_source(input_path).find_first(CALENDAR_TITLE)
+    calendar_section = load_pointer(input_path, pointer) if pointer else None
+    
+    if not calendar_section:
+        print("Calendar section not found!")
+        return
+    
+    output_data = build_calendar(metadata, calendar_section, FootnoteTable.from_source(input_path))
     
     # Write the output
     with open(output_path, 'w', encoding='utf-8') as f:
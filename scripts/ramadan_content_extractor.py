@@ -6,33 +6,38 @@ Extracts Ramadan-related content from mafatih_structured.json and
 generates TypeScript content for the Shahr Ramadan website.
 """
 
-import json
 import re
+import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 JSON_PATH = PROJECT_ROOT / "mafatih_structured.json"
 OUTPUT_PATH = PROJECT_ROOT / "app" / "src" / "data" / "ramadan_extracted.ts"
+SCHEDULE_PATH = PROJECT_ROOT / "app" / "src" / "data" / "day_schedule.json"
 
+# Shared generator helpers live in tools/
+sys.path.insert(0, str(PROJECT_ROOT / "tools"))
+from instrumentation import Instrumentation  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+from models import Aamal, Dua  # noqa: E402
+from schedule_index import ScheduleIndex, load_content_order  # noqa: E402
+from title_index import TitleIndex, load_pointer  # noqa: E402
+from ts_emitter import write_lines  # noqa: E402
 
-def load_json() -> dict:
-    """Load the Mafatih structured JSON."""
-    with open(JSON_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
 
-
-def find_ramadan_chapter(data: dict) -> dict | None:
-    """Find the Ramadan chapter in the JSON structure."""
-    for section in data.get("sections", []):
-        if "RAMADHAN" in section.get("title", "").upper():
-            return section
-        # Check subsections
-        for subsection in section.get("subsections", []):
-            if "RAMADHAN" in subsection.get("title", "").upper():
-                return subsection
+def load_ramadan_chapter() -> dict | None:
+    """
+    Find the Ramadan chapter through the cached title index and stream only
+    that section from the Mafatih JSON, without loading the rest of the book.
+    """
+    # A top-level section or one of its subsections whose title mentions Ramadhan
+    chapter_pointer = re.compile(r"^/sections/\d+(?:/subsections/\d+)?$")
+    for pointer in TitleIndex.for_source(JSON_PATH).find("ramadhan", substring=True):
+        if chapter_pointer.match(pointer):
+            return load_pointer(JSON_PATH, pointer)
     return None
 
 
@@ -50,12 +55,35 @@ def extract_english_text(block: dict) -> str:
     return ""
 
 
+# Title keywords, each matched case-insensitively in a single scan
+DAY_KEYWORDS = KeywordMatcher({
+    "GENERAL": "all",
+    "DAYS & NIGHTS": "all",
+    "SHAB QADR": "qadr",
+    "LAYLAT": "qadr",
+    "LAST NIGHT": "last_night",
+})
+
+LEVEL_KEYWORDS = KeywordMatcher({
+    # Level 1: Essential daily practices
+    "GENERAL": 1,
+    "IFTITAH": 1,
+    "SHORT DUA": 1,
+    "SHAB QADR": 1,
+    "LAYLAT": 1,
+    # Level 3: Advanced practices
+    "PRAYER FOR THE": 3,
+    "PRAYERS FOR THE NIGHTS": 3,
+})
+
+
 def get_day_from_title(title: str) -> list[int] | str:
     """Extract day number(s) from a section title."""
     title_upper = title.upper()
+    keywords = DAY_KEYWORDS.values(title)
     
     # Check for "all" days patterns
-    if "GENERAL" in title_upper or "DAYS & NIGHTS" in title_upper:
+    if "all" in keywords:
         return "all"
     
     # Extract specific day numbers
@@ -72,10 +100,10 @@ def get_day_from_title(title: str) -> list[int] | str:
     days.extend([int(m) for m in alt_matches])
     
     # Special cases
-    if "SHAB QADR" in title_upper or "LAYLAT" in title_upper:
+    if "qadr" in keywords:
         return [19, 21, 23]  # Nights of Power
     
-    if "LAST NIGHT" in title_upper:
+    if "last_night" in keywords:
         return [29, 30]
     
     if days:
@@ -86,22 +114,9 @@ def get_day_from_title(title: str) -> list[int] | str:
 
 def determine_level(title: str, section_type: str) -> int:
     """Determine the priority level (1-3) based on content type."""
-    title_upper = title.upper()
-    
-    # Level 1: Essential daily practices
-    if any(keyword in title_upper for keyword in [
-        "GENERAL", "IFTITAH", "SHORT DUA", "SHAB QADR", "LAYLAT"
-    ]):
-        return 1
-    
-    # Level 3: Advanced practices
-    if any(keyword in title_upper for keyword in [
-        "PRAYER FOR THE", "PRAYERS FOR THE NIGHTS"
-    ]):
-        return 3
-    
+    # Level 1 keywords take precedence over level 3; anything else is
     # Level 2: Intermediate
-    return 2
+    return min(LEVEL_KEYWORDS.values(title), default=2)
 
 
 def escape_typescript_string(s: str) -> str:
@@ -115,7 +130,7 @@ def escape_typescript_string(s: str) -> str:
     return s
 
 
-def process_section(section: dict) -> tuple[list[dict], list[dict]]:
+def process_section(section: dict) -> tuple[list[Dua], list[Aamal]]:
     """Process a section and extract duas and aamal."""
     duas = []
     aamal = []
@@ -157,41 +172,34 @@ def process_section(section: dict) -> tuple[list[dict], list[dict]]:
     combined_arabic = "\n\n".join(arabic_texts) if arabic_texts else ""
     combined_english = "\n\n".join(english_texts) if english_texts else ""
     
-    # Create the entry
-    entry = {
-        "id": id_base,
-        "name": title.title() if title else "Unnamed",
-        "arabicName": "",  # We don't have Arabic titles in the JSON
-        "description": combined_english[:300] + "..." if len(combined_english) > 300 else combined_english,
-        "level": level,
-        "source": "Mafatih al-Jinan",
-        "applicableDays": days,
-        "arabicText": combined_arabic,
-        "englishTranslation": "",
-        "transliteration": "",
-        "preamble": "",
-        "postamble": "",
-    }
+    # Fields shared by the dua or aamal entry
+    fields = dict(
+        id=id_base,
+        name=title.title() if title else "Unnamed",
+        arabic_name="",  # We don't have Arabic titles in the JSON
+        description=combined_english[:300] + "..." if len(combined_english) > 300 else combined_english,
+        level=level,
+        applicable_days=days,
+        arabic_text=combined_arabic,
+    )
     
     if is_dua or (not is_aamal and not is_prayer and arabic_texts):
-        duas.append(entry)
+        duas.append(Dua(**fields))
     elif is_aamal or is_prayer:
-        entry["instructions"] = english_texts
-        entry["timing"] = "Night" if "NIGHT" in title.upper() else "Day" if "DAY" in title.upper() else ""
-        aamal.append(entry)
+        timing = "Night" if "NIGHT" in title.upper() else "Day" if "DAY" in title.upper() else ""
+        aamal.append(Aamal(**fields, instructions=english_texts, timing=timing))
     else:
         # Default to dua if has Arabic text
         if arabic_texts:
-            duas.append(entry)
+            duas.append(Dua(**fields))
         elif english_texts:
-            entry["instructions"] = english_texts
-            aamal.append(entry)
+            aamal.append(Aamal(**fields, instructions=english_texts))
     
     return duas, aamal
 
 
-def generate_typescript(duas: list[dict], aamal: list[dict]) -> str:
-    """Generate TypeScript content file."""
+def generate_typescript(duas: list[Dua], aamal: list[Aamal]) -> Iterator[str]:
+    """Generate the TypeScript content file, yielding one line at a time."""
     
     def format_days(days) -> str:
         if days == "all":
@@ -209,10 +217,11 @@ def generate_typescript(duas: list[dict], aamal: list[dict]) -> str:
     def format_instructions(instructions: list) -> str:
         if not instructions:
             return "[]"
-        items = [format_string(i) for i in instructions]
-        return f"[\n      {',\n      '.join(items)}\n    ]"
+        separator = ",\n      "
+        items = separator.join(format_string(i) for i in instructions)
+        return f"[\n      {items}\n    ]"
     
-    lines = [
+    yield from [
         "// Auto-generated from mafatih_structured.json",
         "// DO NOT EDIT MANUALLY - Run ramadan_content_extractor.py to regenerate",
         "",
@@ -249,54 +258,61 @@ def generate_typescript(duas: list[dict], aamal: list[dict]) -> str:
     
     # Add duas
     for dua in duas:
-        lines.append("  {")
-        lines.append(f"    id: '{dua['id']}',")
-        lines.append(f"    name: {format_string(dua['name'])},")
-        lines.append(f"    arabicName: {format_string(dua['arabicName'])},")
-        lines.append(f"    description: {format_string(dua['description'])},")
-        lines.append(f"    level: {dua['level']},")
-        lines.append(f"    source: '{dua['source']}',")
-        lines.append(f"    applicableDays: {format_days(dua['applicableDays'])},")
-        if dua.get('arabicText'):
-            lines.append(f"    arabicText: {format_string(dua['arabicText'])},")
-        if dua.get('englishTranslation'):
-            lines.append(f"    englishTranslation: {format_string(dua['englishTranslation'])},")
-        if dua.get('transliteration'):
-            lines.append(f"    transliteration: {format_string(dua['transliteration'])},")
-        lines.append("  },")
-    
-    lines.append("];")
-    lines.append("")
-    lines.append("export const aamal: Aamal[] = [")
+        yield "  {"
+        yield f"    id: '{dua.id}',"
+        yield f"    name: {format_string(dua.name)},"
+        yield f"    arabicName: {format_string(dua.arabic_name)},"
+        yield f"    description: {format_string(dua.description)},"
+        yield f"    level: {dua.level},"
+        yield f"    source: '{dua.source}',"
+        yield f"    applicableDays: {format_days(dua.applicable_days)},"
+        if dua.arabic_text:
+            yield f"    arabicText: {format_string(dua.arabic_text)},"
+        if dua.english_translation:
+            yield f"    englishTranslation: {format_string(dua.english_translation)},"
+        if dua.transliteration:
+            yield f"    transliteration: {format_string(dua.transliteration)},"
+        yield "  },"
+    
+    yield "];"
+    yield ""
+    yield "export const aamal: Aamal[] = ["
     
     # Add aamal
     for a in aamal:
-        lines.append("  {")
-        lines.append(f"    id: '{a['id']}',")
-        lines.append(f"    name: {format_string(a['name'])},")
-        lines.append(f"    arabicName: {format_string(a['arabicName'])},")
-        lines.append(f"    description: {format_string(a['description'])},")
-        lines.append(f"    level: {a['level']},")
-        lines.append(f"    source: '{a['source']}',")
-        lines.append(f"    applicableDays: {format_days(a['applicableDays'])},")
-        if a.get('timing'):
-            lines.append(f"    timing: '{a['timing']}',")
-        if a.get('instructions'):
-            lines.append(f"    instructions: {format_instructions(a['instructions'])},")
-        lines.append("  },")
-    
-    lines.append("];")
-    lines.append("")
-    
-    return "\n".join(lines)
+        yield "  {"
+        yield f"    id: '{a.id}',"
+        yield f"    name: {format_string(a.name)},"
+        yield f"    arabicName: {format_string(a.arabic_name)},"
+        yield f"    description: {format_string(a.description)},"
+        yield f"    level: {a.level},"
+        yield f"    source: '{a.source}',"
+        yield f"    applicableDays: {format_days(a.applicable_days)},"
+        if a.timing:
+            yield f"    timing: '{a.timing}',"
+        if a.instructions:
+            yield f"    instructions: {format_instructions(a.instructions)},"
+        yield "  },"
+    
+    yield "];"
 
 
 def main():
-    print("Loading Mafatih JSON...")
-    data = load_json()
-    
-    print("Finding Ramadan chapter...")
-    ramadan_chapter = find_ramadan_chapter(data)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract Ramadan content from mafatih_structured.json")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run (cProfile, tracemalloc) and write a Chrome trace to tools/.cache/profile/")
+    args = parser.parse_args()
+
+    with Instrumentation("ramadan_content_extractor", args.profile) as instr:
+        extract(instr)
+
+
+def extract(instr: Instrumentation):
+    print("Finding Ramadan chapter in Mafatih JSON...")
+    with instr.stage("load"):
+        ramadan_chapter = load_ramadan_chapter()
     
     if not ramadan_chapter:
         print("ERROR: Could not find Ramadan chapter!")
@@ -307,40 +323,47 @@ def main():
     all_duas = []
     all_aamal = []
     
-    # Process main chapter content blocks
-    duas, aamal = process_section(ramadan_chapter)
-    all_duas.extend(duas)
-    all_aamal.extend(aamal)
-    
-    # Process subsections
-    subsections = ramadan_chapter.get("subsections", [])
-    print(f"Processing {len(subsections)} subsections...")
-    
-    for subsection in subsections:
-        duas, aamal = process_section(subsection)
+    with instr.stage("extract") as stage:
+        # Process main chapter content blocks
+        duas, aamal = process_section(ramadan_chapter)
         all_duas.extend(duas)
         all_aamal.extend(aamal)
         
-        # Process nested subsections if any
-        for nested in subsection.get("subsections", []):
-            duas, aamal = process_section(nested)
+        # Process subsections
+        subsections = ramadan_chapter.get("subsections", [])
+        print(f"Processing {len(subsections)} subsections...")
+        
+        for subsection in subsections:
+            duas, aamal = process_section(subsection)
             all_duas.extend(duas)
             all_aamal.extend(aamal)
+            
+            # Process nested subsections if any
+            for nested in subsection.get("subsections", []):
+                duas, aamal = process_section(nested)
+                all_duas.extend(duas)
+                all_aamal.extend(aamal)
+        stage.items = len(all_duas) + len(all_aamal)
     
     print(f"Extracted {len(all_duas)} duas and {len(all_aamal)} aamal")
     
     # Generate TypeScript
     print("Generating TypeScript...")
-    ts_content = generate_typescript(all_duas, all_aamal)
-    
-    # Write output
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        f.write(ts_content)
-    
-    print(f"Written to: {OUTPUT_PATH}")
-    print("Done!")
+    # Write output (streamed to a temp file and renamed into place)
+    with instr.stage("emit_ts", len(all_duas) + len(all_aamal)):
+        written = write_lines(OUTPUT_PATH, generate_typescript(all_duas, all_aamal))
+    if written:
+        print(f"Written to: {OUTPUT_PATH}")
+    else:
+        print(f"Unchanged: {OUTPUT_PATH}")
 
+    with instr.stage("schedule", len(all_duas) + len(all_aamal)):
+        items = [item.to_dict() for item in all_duas + all_aamal]
+        schedule = ScheduleIndex.from_items(items, load_content_order(PROJECT_ROOT))
+        written = schedule.write_json(SCHEDULE_PATH)
+    if written:
+        print(f"Written to: {SCHEDULE_PATH}")
+    print("Done!")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+"""
+On-disk build cache for the data generators.
+
+Keeps a manifest of every source file that was processed (content hash,
+mtime and size) together with the normalised item it produced, so that a
+rebuild only re-parses files that actually changed.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+MANIFEST_VERSION = 1
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BuildCache:
+    """Manifest of source file fingerprints and the items they produced."""
+
+    def __init__(self, manifest_path: Path, salt: str = ""):
+        self.manifest_path = Path(manifest_path)
+        # The salt invalidates every entry when the normalisation logic changes
+        self.salt = salt
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != MANIFEST_VERSION or data.get("salt") != self.salt:
+            self.dirty = True
+            return
+        self.entries = data.get("files", {})
+
+    def lookup(self, path: Path) -> tuple[Any, dict[str, Any]]:
+        """
+        Return ``(result, fingerprint)`` for a source file.
+
+        ``result`` is the cached value if the file is unchanged, otherwise
+        None. The fingerprint should be passed back to :meth:`store`.
+        """
+        key = Path(path).name
+        stat = os.stat(path)
+        fingerprint = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+        entry = self.entries.get(key)
+
+        if entry and entry["mtime"] == fingerprint["mtime"] and entry["size"] == fingerprint["size"]:
+            self.hits += 1
+            fingerprint["sha256"] = entry["sha256"]
+            return entry["result"], fingerprint
+
+        # mtime changed (e.g. after a checkout) - fall back to the content hash
+        fingerprint["sha256"] = file_digest(path)
+        if entry and entry["sha256"] == fingerprint["sha256"]:
+            self.hits += 1
+            self.store(path, fingerprint, entry["result"])
+            return entry["result"], fingerprint
+
+        self.misses += 1
+        return None, fingerprint
+
+    def store(self, path: Path, fingerprint: dict[str, Any], result: Any):
+        self.entries[Path(path).name] = {**fingerprint, "result": result}
+        self.dirty = True
+
+    def prune(self, keep: set[str]):
+        """Drop entries for source files that no longer exist."""
+        for key in list(self.entries):
+            if key not in keep:
+                del self.entries[key]
+                self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "salt": self.salt, "files": self.entries}
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+        self.dirty = False
+
@@ -1,18 +1,14 @@
 """
 Ramadan Calendar Event Editor
-A Tkinter GUI for adding calendar events directly to content.ts
+A Tkinter GUI for adding, updating and deleting the calendar events in
+app/src/data/calendar_events.json (through calendar_events.py)
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import re
-import os
 
-# Path to the content.ts file
-CONTENT_FILE = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-    "app", "src", "data", "content.ts"
-)
+from calendar_events import EVENTS_PATH, CalendarEventStore, load_events
+from models import CalendarEvent
 
 EVENT_TYPES = [
     ("🌙 Occasion", "occasion"),
@@ -32,7 +28,7 @@ class CalendarEventEditor:
     def __init__(self, root):
         self.root = root
         self.root.title("Ramadan Calendar Event Editor")
-        self.root.geometry("600x700")
+        self.root.geometry("600x900")
         self.root.configure(bg="#1a1a1a")
         
         # Variables
@@ -42,8 +38,12 @@ class CalendarEventEditor:
         self.desc_var = tk.StringVar()
         self.type_var = tk.StringVar(value="occasion")
         self.level_var = tk.IntVar(value=1)
+        # Id of the event loaded from the list, if any
+        self.selected_id = None
+        self.listed_ids = []
         
         self.create_widgets()
+        self.refresh_events()
         
     def create_widgets(self):
         # Style
@@ -63,10 +63,17 @@ class CalendarEventEditor:
                               font=("Segoe UI", 16, "bold"), bg="#1a1a1a", fg="#4ade80")
         title_label.pack(pady=(0, 5))
         
-        subtitle = tk.Label(main_frame, text="Add events directly to content.ts",
+        subtitle = tk.Label(main_frame, text="Select an event to edit it, or fill in the form to add one",
                            font=("Segoe UI", 10), bg="#1a1a1a", fg="#888")
         subtitle.pack(pady=(0, 20))
         
+        # Existing events
+        self.events_list = tk.Listbox(main_frame, height=8, bg="#0f0f0f", fg="#e5e5e5",
+                                      selectbackground="#4ade80", selectforeground="#000",
+                                      font=("Segoe UI", 10), activestyle="none")
+        self.events_list.pack(fill=tk.X)
+        self.events_list.bind("<<ListboxSelect>>", self.load_selected)
+        
         # Form Frame
         form_frame = tk.Frame(main_frame, bg="#2a2a2a", padx=20, pady=20)
         form_frame.pack(fill=tk.X, pady=10)
@@ -155,12 +162,24 @@ class CalendarEventEditor:
         btn_frame = tk.Frame(main_frame, bg="#1a1a1a")
         btn_frame.pack(fill=tk.X, pady=20)
         
-        add_btn = tk.Button(btn_frame, text="➕ Add Event to content.ts", 
+        add_btn = tk.Button(btn_frame, text="➕ Add Event", 
                            command=self.add_event, bg="#4ade80", fg="#000",
                            font=("Segoe UI", 11, "bold"), padx=20, pady=10,
                            activebackground="#22c55e", cursor="hand2")
         add_btn.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 5))
         
+        update_btn = tk.Button(btn_frame, text="💾 Update", 
+                              command=self.update_event, bg="#3b82f6", fg="#000",
+                              font=("Segoe UI", 11, "bold"), padx=20, pady=10,
+                              activebackground="#2563eb", cursor="hand2")
+        update_btn.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+        
+        delete_btn = tk.Button(btn_frame, text="✖ Delete", 
+                              command=self.delete_event, bg="#ef4444", fg="#000",
+                              font=("Segoe UI", 11, "bold"), padx=20, pady=10,
+                              activebackground="#dc2626", cursor="hand2")
+        delete_btn.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+        
         clear_btn = tk.Button(btn_frame, text="🗑️ Clear Form", 
                              command=self.clear_form, bg="#2a2a2a", fg="#e5e5e5",
                              font=("Segoe UI", 11), padx=20, pady=10,
@@ -173,11 +192,37 @@ class CalendarEventEditor:
         self.status_label.pack(pady=10)
         
         # File path info
-        path_label = tk.Label(main_frame, text=f"Target: {CONTENT_FILE}", 
+        path_label = tk.Label(main_frame, text=f"Target: {EVENTS_PATH}", 
                              bg="#1a1a1a", fg="#666", font=("Segoe UI", 8), wraplength=550)
         path_label.pack(pady=10)
         
+    def refresh_events(self):
+        self.events_list.delete(0, tk.END)
+        self.listed_ids = []
+        for event in load_events():
+            self.events_list.insert(tk.END, f"Day {event.date:>2}  ·  L{event.level}  ·  {event.title}")
+            self.listed_ids.append(event.id)
+        
+    def load_selected(self, _event=None):
+        selection = self.events_list.curselection()
+        if not selection:
+            return
+        event_id = self.listed_ids[selection[0]]
+        event = next((e for e in load_events() if e.id == event_id), None)
+        if event is None:
+            return
+        self.selected_id = event.id
+        self.date_var.set(event.date)
+        self.title_var.set(event.title)
+        self.arabic_var.set(event.arabic_title or "")
+        self.desc_text.delete("1.0", tk.END)
+        self.desc_text.insert("1.0", event.description)
+        self.type_var.set(event.type)
+        self.level_var.set(event.level)
+        
     def clear_form(self):
+        self.selected_id = None
+        self.events_list.selection_clear(0, tk.END)
         self.date_var.set(1)
         self.title_var.set("")
         self.arabic_var.set("")
@@ -185,74 +230,59 @@ class CalendarEventEditor:
         self.type_var.set("occasion")
         self.level_var.set(1)
         
+    def form_event(self):
+        """The event described by the form; validated by the store when saved."""
+        try:
+            date = self.date_var.get()
+        except tk.TclError:
+            date = 0
+        return CalendarEvent(
+            date=date,
+            title=self.title_var.get().strip(),
+            description=self.desc_text.get("1.0", tk.END).strip(),
+            type=self.type_var.get(),
+            level=self.level_var.get(),
+            arabic_title=self.arabic_var.get().strip() or None,
+            id=self.selected_id,
+        )
+        
+    def save(self, change, message):
+        """Run ``change(store)`` in one locked write of calendar_events.json."""
+        try:
+            with CalendarEventStore() as store:
+                change(store)
+        except (KeyError, ValueError) as e:
+            messagebox.showerror("Error", e.args[0] if e.args else str(e))
+            return False
+        
+        self.status_label.config(text=f"✓ {message}")
+        self.root.after(3000, lambda: self.status_label.config(text=""))
+        self.clear_form()
+        self.refresh_events()
+        return True
+        
     def add_event(self):
-        # Get values
-        date = self.date_var.get()
-        title = self.title_var.get().strip()
-        arabic = self.arabic_var.get().strip()
-        description = self.desc_text.get("1.0", tk.END).strip()
-        event_type = self.type_var.get()
-        level = self.level_var.get()
-        
-        # Validate
-        if not title:
-            messagebox.showerror("Error", "Title is required!")
-            return
-        if not description:
-            messagebox.showerror("Error", "Description is required!")
+        event = self.form_event()
+        # Always a new event, even if the form was loaded from the list
+        event.id = None
+        if self.save(lambda store: store.insert([event]), f"Added '{event.title}'"):
+            messagebox.showinfo("Success", f"Event '{event.title}' added!\n\nThe app will auto-reload if dev server is running.")
+        
+    def update_event(self):
+        if self.selected_id is None:
+            messagebox.showerror("Error", "Select an event to update first!")
             return
-        if date < 1 or date > 30:
-            messagebox.showerror("Error", "Day must be between 1 and 30!")
-            return
-            
-        # Check if file exists
-        if not os.path.exists(CONTENT_FILE):
-            messagebox.showerror("Error", f"Could not find content.ts at:\n{CONTENT_FILE}")
+        event = self.form_event()
+        self.save(lambda store: store.update([event]), f"Updated '{event.title}'")
+        
+    def delete_event(self):
+        if self.selected_id is None:
+            messagebox.showerror("Error", "Select an event to delete first!")
             return
-            
-        # Read file
-        with open(CONTENT_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Find the calendarEvents array
-        pattern = r'(export const calendarEvents: CalendarEvent\[\] = \[)'
-        match = re.search(pattern, content)
-        
-        if not match:
-            messagebox.showerror("Error", "Could not find calendarEvents array in content.ts")
+        event_id = self.selected_id
+        if not messagebox.askyesno("Delete", f"Delete {event_id}?"):
             return
-            
-        # Build new event
-        new_event = f"""
-  {{
-    date: {date},
-    title: '{title.replace("'", "\\'")}',"""
-        
-        if arabic:
-            new_event += f"""
-    arabicTitle: '{arabic}',"""
-            
-        new_event += f"""
-    description: '{description.replace("'", "\\'")}',
-    type: '{event_type}',
-    level: {level}
-  }},"""
-        
-        # Insert after the opening bracket
-        insert_pos = match.end()
-        new_content = content[:insert_pos] + new_event + content[insert_pos:]
-        
-        # Write back
-        with open(CONTENT_FILE, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-            
-        self.status_label.config(text=f"✓ Added '{title}' to content.ts!")
-        self.root.after(3000, lambda: self.status_label.config(text=""))
-        
-        # Clear form
-        self.clear_form()
-        
-        messagebox.showinfo("Success", f"Event '{title}' added to content.ts!\n\nThe app will auto-reload if dev server is running.")
+        self.save(lambda store: store.delete([event_id]), f"Deleted {event_id}")
 
 
 def main():
@@ -0,0 +1,482 @@
+"""
+The Ramadan calendar events, stored as structured data.
+
+The events used to be a hand-edited array literal in app/src/data/content.ts,
+which the Tkinter editor patched with a regex. They now live in
+app/src/data/calendar_events.json (content.ts imports it) and are edited
+through :class:`CalendarEventStore`:
+
+    with CalendarEventStore() as store:
+        store.insert([CalendarEvent(date=27, title=..., description=..., type="occasion")])
+        store.delete(["ramadan-19-wounding-of-imam-ali-as"])
+
+A store holds an exclusive lock on the file for the length of the ``with``
+block, applies any number of inserts, updates and deletes in memory, and
+writes the result once, atomically (temp file + rename), when the block
+exits without an error. Every event has a stable ``id``; one is derived
+from the date and title when an event is inserted without it. Inserting
+an event that is already stored (same day and title, or same content)
+leaves the store as it is.
+
+Usage:
+    python tools/calendar_events.py list
+    python tools/calendar_events.py add --date 27 --title "..." --description "..." [--type occasion] [--level 2]
+    python tools/calendar_events.py update ramadan-10-passing-of-khadijah-al-kubra-as --level 2
+    python tools/calendar_events.py delete ramadan-17-victory-of-the-battle-of-badr
+    python tools/calendar_events.py apply changes.json   # {"insert": [...], "update": [...], "delete": [...]}
+    python tools/calendar_events.py import [ramadan_calendar.json] [--refresh]
+"""
+
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from keyword_matcher import EVENT_VERBS, day_from_header
+from models import CalendarEvent
+from search_index import tokenize
+from ts_emitter import AtomicWriter
+
+PROJECT_ROOT = Path(__file__).parent.parent
+EVENTS_PATH = PROJECT_ROOT / "app" / "src" / "data" / "calendar_events.json"
+CALENDAR_PATH = PROJECT_ROOT / "ramadan_calendar.json"
+
+# The CalendarEvent['type'] union in content.ts
+EVENT_TYPES = ("occasion", "night-of-power", "martyrdom", "birth")
+# Operations of an apply() batch, in the order they are applied
+BATCH_OPERATIONS = ("delete", "update", "insert")
+
+# Words of an Arabic event title that say nothing about whose event it is
+SUBJECT_STOPWORDS = set("عليه عليها عليهم السلام صلي الله و اله في سنه السنه ه للهجره للبعثه".split())
+# Share of the shorter title's subject words the other must contain
+SUBJECT_OVERLAP = 0.5
+
+# Kind of event (keyword_matcher.EVENT_VERBS) -> event type in the app
+TYPE_BY_VERB = {
+    "death": "martyrdom",
+    "martyrdom": "martyrdom",
+    "wounding": "martyrdom",
+    "birth": "birth",
+    "victory": "occasion",
+}
+
+# Honorifics written out in the translation, abbreviated in event titles
+HONORIFICS = [
+    (re.compile(r"\s*\(peace and blessings be upon him and his progeny\)"), " (saw)"),
+    (re.compile(r"\s*\(peace be upon (?:him|her|them)\)"), " (as)"),
+]
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def event_id(event: CalendarEvent) -> str:
+    """The id given to an event inserted without one."""
+    return f"ramadan-{event.date}-{slugify(event.title)}"
+
+
+def validate(event: CalendarEvent) -> list[str]:
+    """Problems that would make ``event`` invalid in the app, if any."""
+    problems = []
+    if not isinstance(event.date, int) or not 1 <= event.date <= 30:
+        problems.append(f"date must be a day of Ramadan (1-30), got {event.date!r}")
+    for field in ("title", "description"):
+        value = getattr(event, field)
+        if not isinstance(value, str):
+            problems.append(f"{field} must be a string, got {type(value).__name__}")
+        elif not value.strip():
+            problems.append(f"{field} is required")
+    if event.arabic_title is not None and not isinstance(event.arabic_title, str):
+        problems.append(f"arabicTitle must be a string, got {type(event.arabic_title).__name__}")
+    if not isinstance(event.type, str) or event.type not in EVENT_TYPES:
+        problems.append(f"type must be one of {', '.join(EVENT_TYPES)}, got {event.type!r}")
+    if event.level not in (1, 2, 3):
+        problems.append(f"level must be 1, 2 or 3, got {event.level!r}")
+    return problems
+
+
+def batch_problems(changes) -> list[str]:
+    """
+    Problems with the shape of an ``apply`` batch, each naming the operation,
+    record index and field, e.g. ``update[2]: missing required field 'type'``.
+    """
+    if not isinstance(changes, dict):
+        return [f"a batch must be an object with insert/update/delete lists, got {type(changes).__name__}"]
+    problems = [f"unknown operation {op!r}" for op in changes if op not in BATCH_OPERATIONS]
+    for op in BATCH_OPERATIONS:
+        records = changes.get(op, [])
+        if not isinstance(records, list):
+            problems.append(f"{op}: expected a list, got {type(records).__name__}")
+            continue
+        for i, record in enumerate(records):
+            if op == "delete":
+                if not isinstance(record, str):
+                    problems.append(f"delete[{i}]: expected an event id, got {record!r}")
+                continue
+            if not isinstance(record, dict):
+                problems.append(f"{op}[{i}]: expected an event object, got {type(record).__name__}")
+                continue
+            required = CalendarEvent.REQUIRED_FIELDS + (("id",) if op == "update" else ())
+            missing = [key for key in required if key not in record]
+            problems.extend(f"{op}[{i}]: missing required field {key!r}" for key in missing)
+            if missing:
+                continue
+            if "id" in record and not isinstance(record["id"], str):
+                problems.append(f"{op}[{i}]: id must be a string, got {type(record['id']).__name__}")
+            problems.extend(f"{op}[{i}]: {problem}" for problem in validate(CalendarEvent.from_dict(record)))
+    return problems
+
+
+def load_events(path: Path = EVENTS_PATH) -> list[CalendarEvent]:
+    """Read the events without taking the lock (for read-only use)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [CalendarEvent.from_dict(data) for data in json.load(f)]
+    except FileNotFoundError:
+        return []
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Exclusive advisory lock on ``path`` (a sidecar lock file, so the data
+    file itself can be replaced by rename while the lock is held).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            # LK_LOCK retries for about 10 seconds before giving up
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class CalendarEventStore:
+    """
+    Locked, batched editing of calendar_events.json. Changes are written
+    once, when the ``with`` block exits cleanly; ``changed`` then says
+    whether the file was rewritten.
+    """
+
+    def __init__(self, path: Path = EVENTS_PATH):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(f".{self.path.name}.lock")
+        self.events: list[CalendarEvent] = []
+        self.changed = False
+        self._lock = None
+
+    def __enter__(self) -> "CalendarEventStore":
+        self._lock = file_lock(self.lock_path)
+        self._lock.__enter__()
+        try:
+            self.events = load_events(self.path)
+        except BaseException:
+            self._lock.__exit__(*sys.exc_info())
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.save()
+        finally:
+            self._lock.__exit__(exc_type, exc, tb)
+            self._lock = None
+        return False
+
+    def get(self, id: str) -> CalendarEvent | None:
+        return next((event for event in self.events if event.id == id), None)
+
+    def _index(self, id: str) -> int:
+        for i, event in enumerate(self.events):
+            if event.id == id:
+                return i
+        raise KeyError(f"No calendar event with id {id!r}")
+
+    def _check(self, event: CalendarEvent):
+        problems = validate(event)
+        if problems:
+            raise ValueError(f"Invalid calendar event {event.id or event.title!r}: {'; '.join(problems)}")
+
+    def find_duplicate(self, event: CalendarEvent) -> CalendarEvent | None:
+        """The stored event ``event`` repeats: same day and title, or the same content."""
+        payload = {key: value for key, value in event.to_dict().items() if key != "id"}
+        for current in self.events:
+            if current.date == event.date and slugify(current.title) == slugify(event.title):
+                return current
+            if {key: value for key, value in current.to_dict().items() if key != "id"} == payload:
+                return current
+        return None
+
+    def insert(self, events: Iterable[CalendarEvent]) -> list[str]:
+        """
+        Add new events; returns their ids. An event that repeats a stored one
+        (see :meth:`find_duplicate`) is not added again and the stored id is
+        returned; an explicit id that is already taken by another event is an
+        error.
+        """
+        ids = []
+        for event in events:
+            self._check(event)
+            duplicate = self.find_duplicate(event)
+            if duplicate is not None and event.id in (None, duplicate.id):
+                ids.append(duplicate.id)
+                continue
+            if event.id is None:
+                base = event.id = event_id(event)
+                suffix = 2
+                while self.get(event.id) is not None:
+                    event.id = f"{base}-{suffix}"
+                    suffix += 1
+            elif self.get(event.id) is not None:
+                raise ValueError(f"A calendar event with id {event.id!r} already exists")
+            self.events.append(event)
+            ids.append(event.id)
+        return ids
+
+    def update(self, events: Iterable[CalendarEvent]):
+        """Replace existing events, matched by id."""
+        for event in events:
+            self._check(event)
+            self.events[self._index(event.id)] = event
+
+    def delete(self, ids: Iterable[str]):
+        for id in ids:
+            del self.events[self._index(id)]
+
+    def apply(self, changes: dict):
+        """Apply a batch of ``{"insert": [...], "update": [...], "delete": [ids]}`` (camelCase events)."""
+        problems = batch_problems(changes)
+        if problems:
+            raise ValueError(f"Invalid batch: {'; '.join(problems)}")
+        self.delete(changes.get("delete", []))
+        self.update(CalendarEvent.from_dict(data) for data in changes.get("update", []))
+        self.insert(CalendarEvent.from_dict(data) for data in changes.get("insert", []))
+
+    def save(self) -> bool:
+        # Ordered by day; events of the same day keep their relative order
+        self.events.sort(key=lambda event: event.date)
+        writer = AtomicWriter(self.path)
+        with writer as f:
+            json.dump([event.to_dict() for event in self.events], f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        self.changed = writer.changed
+        return self.changed
+
+
+def subject_words(arabic_title: str) -> set[str]:
+    """Folded words of an Arabic event title, without its event verbs and the honorifics."""
+    skip = set(SUBJECT_STOPWORDS)
+    for keyword, _ in EVENT_VERBS.finditer(arabic_title):
+        skip.update(tokenize(keyword))
+    return {word for word in tokenize(arabic_title) if word not in skip and not word.isdigit()}
+
+
+def same_event(imported: CalendarEvent, current: CalendarEvent) -> bool:
+    """
+    Whether ``current`` (in the store) is the event ``imported`` describes.
+    Curated Arabic titles are shortened from the source sentence, so two
+    titles match when they open with the same event verb on the same day
+    and most words of the shorter one's subject appear in the other. Events
+    written without an Arabic title match on the id or title the imported
+    event would get.
+    """
+    if imported.date != current.date:
+        return False
+    if current.id is not None and current.id == (imported.id or event_id(imported)):
+        return True
+    if slugify(current.title) == slugify(imported.title):
+        return True
+    if not (imported.arabic_title and current.arabic_title):
+        return False
+    if EVENT_VERBS.search(imported.arabic_title) != EVENT_VERBS.search(current.arabic_title):
+        return False
+    a, b = subject_words(imported.arabic_title), subject_words(current.arabic_title)
+    if not a or not b:
+        return a == b
+    return len(a & b) / min(len(a), len(b)) >= SUBJECT_OVERLAP
+
+
+def title_from_english(english: str) -> str:
+    """A short title from the translated event sentence ("The passing of X in the tenth year ..." -> "Passing of X")."""
+    title = re.sub(r"^the\s+", "", english.strip(), flags=re.IGNORECASE)
+    title = re.split(r",?\s+(?:in the \w+ year|at the hands of)\b", title, maxsplit=1)[0].rstrip(" .,")
+    for pattern, short in HONORIFICS:
+        title = pattern.sub(short, title)
+    return title[:1].upper() + title[1:]
+
+
+def events_from_calendar(calendar: dict) -> Iterator[CalendarEvent]:
+    """Events of a ramadan_calendar.json document (scripts/extract_calendar.py)."""
+    for entry in calendar["calendar"]["events"]:
+        day = day_from_header(entry["date_arabic"])
+        if day is None:
+            raise ValueError(f"Not a day of Ramadan: {entry['date_arabic']!r}")
+        for source in entry["events"]:
+            verb = EVENT_VERBS.search(source["arabic"])
+            if verb is None:
+                raise ValueError(f"No event verb in {source['arabic']!r}")
+            yield CalendarEvent(
+                date=day,
+                title=title_from_english(source["english"]),
+                description=source["english"].strip(),
+                type=TYPE_BY_VERB[verb],
+                arabic_title=source["arabic"].strip().rstrip(" ."),
+            )
+
+
+def import_calendar(store: CalendarEventStore, calendar: dict, refresh: bool = False) -> dict:
+    """
+    Merge the events of ``calendar`` into ``store`` by :func:`same_event`.
+    New events are inserted; an event already in the store keeps its
+    curated title, level and type, and its description and Arabic title
+    are only replaced with ``refresh``. An imported event that matches
+    more than one stored event, or one already matched by another imported
+    event, is a collision: it is left alone and listed under
+    ``"collisions"``. Returns counts of each outcome and the collisions.
+    """
+    known = list(store.events)
+    inserts, updates, collisions = [], [], []
+    unchanged = 0
+    claimed_by: dict[int, CalendarEvent] = {}
+    for event in events_from_calendar(calendar):
+        matches = [current for current in known if same_event(event, current)]
+        if len(matches) > 1:
+            collisions.append(f"day {event.date} {event.title!r} matches "
+                              f"{', '.join(repr(match.id or match.title) for match in matches)}")
+            continue
+        if not matches:
+            inserts.append(event)
+            known.append(event)
+            claimed_by[id(event)] = event
+            continue
+        current = matches[0]
+        if id(current) in claimed_by:
+            collisions.append(f"day {event.date} {event.title!r} matches {current.id or current.title!r}, "
+                              f"already matched by {claimed_by[id(current)].title!r}")
+            continue
+        claimed_by[id(current)] = event
+        if refresh and (current.description, current.arabic_title) != (event.description, event.arabic_title):
+            updated = CalendarEvent.from_dict(current.to_dict())
+            updated.description = event.description
+            updated.arabic_title = event.arabic_title
+            updates.append(updated)
+        else:
+            unchanged += 1
+    store.insert(inserts)
+    store.update(updates)
+    return {"inserted": len(inserts), "updated": len(updates), "unchanged": unchanged, "collisions": collisions}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Edit the Ramadan calendar events (app/src/data/calendar_events.json)")
+    parser.add_argument("--file", type=Path, default=EVENTS_PATH, help="Events file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Print the events")
+    list_parser.add_argument("--json", action="store_true", help="Print the raw JSON records")
+
+    def add_fields(command, required):
+        command.add_argument("--date", type=int, required=required, help="Day of Ramadan (1-30)")
+        command.add_argument("--title", required=required)
+        command.add_argument("--description", required=required)
+        command.add_argument("--arabic-title")
+        command.add_argument("--type", choices=EVENT_TYPES, default="occasion" if required else None)
+        command.add_argument("--level", type=int, choices=(1, 2, 3), default=1 if required else None)
+
+    add_parser = commands.add_parser("add", help="Add an event")
+    add_parser.add_argument("--id", help="Event id (default: derived from the date and title)")
+    add_fields(add_parser, required=True)
+
+    update_parser = commands.add_parser("update", help="Change fields of an event")
+    update_parser.add_argument("id")
+    add_fields(update_parser, required=False)
+
+    delete_parser = commands.add_parser("delete", help="Remove events")
+    delete_parser.add_argument("ids", nargs="+")
+
+    apply_parser = commands.add_parser("apply", help="Apply a JSON batch of inserts, updates and deletes")
+    apply_parser.add_argument("changes", help="Batch file, or - for stdin")
+
+    import_parser = commands.add_parser("import", help="Merge the events of ramadan_calendar.json")
+    import_parser.add_argument("calendar", nargs="?", type=Path, default=CALENDAR_PATH)
+    import_parser.add_argument("--refresh", action="store_true",
+                               help="Also replace descriptions and Arabic titles of events already present")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        events = load_events(args.file)
+        if args.json:
+            print(json.dumps([event.to_dict() for event in events], indent=2, ensure_ascii=False))
+            return
+        for event in events:
+            print(f"{event.date:>2}  {event.type:<14} L{event.level}  {event.id}  {event.title}")
+        return
+
+    try:
+        with CalendarEventStore(args.file) as store:
+            if args.command == "add":
+                event = CalendarEvent(args.date, args.title, args.description, args.type, args.level,
+                                      args.arabic_title, args.id)
+                count = len(store.events)
+                added = store.insert([event])[0]
+                print(f"Added {added}" if len(store.events) > count else f"Already present as {added}")
+            elif args.command == "update":
+                event = store.get(args.id)
+                if event is None:
+                    raise KeyError(f"No calendar event with id {args.id!r}")
+                updated = CalendarEvent.from_dict(event.to_dict())
+                for field in ("date", "title", "description", "arabic_title", "type", "level"):
+                    if getattr(args, field) is not None:
+                        setattr(updated, field, getattr(args, field))
+                store.update([updated])
+                print(f"Updated {args.id}")
+            elif args.command == "delete":
+                store.delete(args.ids)
+                print(f"Deleted {len(args.ids)} event(s)")
+            elif args.command == "apply":
+                if args.changes == "-":
+                    changes = json.load(sys.stdin)
+                else:
+                    with open(args.changes, "r", encoding="utf-8") as f:
+                        changes = json.load(f)
+                store.apply(changes)
+                print(f"Applied {sum(len(changes.get(op, [])) for op in ('insert', 'update', 'delete'))} change(s)")
+            elif args.command == "import":
+                with open(args.calendar, "r", encoding="utf-8") as f:
+                    counts = import_calendar(store, json.load(f), refresh=args.refresh)
+                collisions = counts.pop("collisions")
+                print(", ".join(f"{count} {outcome}" for outcome, count in counts.items())
+                      + f", {len(collisions)} collision(s)")
+                for collision in collisions:
+                    print(f"  ! {collision}", file=sys.stderr)
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e.args[0] if e.args else e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{store.path} {'updated' if store.changed else 'unchanged'} ({len(store.events)} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Compact binary container for the corpus, read through mmap.
+
+Every tool run used to re-parse the pretty-printed JSON sources. ``export``
+packs DuaAmaal/*.json, common_acts_ramadan.json and
+shahr_ramadan_translated.json into one file that can be memory-mapped and
+read an item at a time:
+
+    header        magic, version, counts and section offsets
+    data          one encoded value per record
+    strings       u32 offsets followed by a UTF-8 blob; every string
+                  (keys, values, record names) is stored once
+    records       (name string, data offset, data length) per record, in
+                  source order
+    index         record numbers sorted by name, for binary search
+
+Values are tagged: null/false/true, i64, f64, a u32 string reference, or a
+list/object with a u32 length. Repeated values such as "Mafatih al-Jinan"
+or the field names of every item cost four bytes after their first use.
+
+Each DuaAmaal file is one record (``dua_amaal/<file stem>``). The two
+section files are split: each element of ``content.items`` is a record
+named ``<collection>/<id>``, and the rest of the document is the
+``<collection>/@root`` record. Opening a pack reads only the header, and
+looking an item up is a binary search over the index, so start-up and
+random access do not depend on the size of the corpus. ``import`` writes
+the original JSON files back byte for byte.
+
+Usage:
+    python tools/corpus_pack.py export                  # write tools/.cache/corpus.pack
+    python tools/corpus_pack.py get common_acts/66      # print one record
+    python tools/corpus_pack.py import --output-dir out # restore the JSON sources
+"""
+
+import glob
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Iterator
+
+from build_cache import CACHE_DIR
+from ts_emitter import AtomicWriter
+
+PROJECT_ROOT = Path(__file__).parent.parent
+PACK_PATH = CACHE_DIR / "corpus.pack"
+
+MAGIC = b"MAFC"
+PACK_VERSION = 1
+# magic, version, n_strings, n_records, strings, records, index offsets
+HEADER = struct.Struct("<4sIIIQQQ")
+RECORD = struct.Struct("<IQI")
+U32 = struct.Struct("<I")
+I64 = struct.Struct("<q")
+F64 = struct.Struct("<d")
+
+NULL, FALSE, TRUE, INT, FLOAT, STRING, LIST, DICT = range(8)
+
+MANIFEST = "@manifest"
+ROOT = "@root"
+
+# (collection, path relative to the project root, split content.items into records)
+SOURCES = [
+    ("dua_amaal", "DuaAmaal/*.json", False),
+    ("common_acts", "common_acts_ramadan.json", True),
+    ("shahr_ramadan", "shahr_ramadan_translated.json", True),
+]
+
+
+class PackError(ValueError):
+    pass
+
+
+# -- Writing ------------------------------------------------------------------
+
+class PackWriter:
+    """Accumulates records and the shared string table, then writes the pack."""
+
+    def __init__(self):
+        self.strings: dict[str, int] = {}
+        self.records: list[tuple[int, int, int]] = []
+        self.data = bytearray()
+
+    def intern(self, text: str) -> int:
+        ref = self.strings.get(text)
+        if ref is None:
+            ref = self.strings[text] = len(self.strings)
+        return ref
+
+    def _encode(self, value: Any, out: bytearray):
+        if value is None:
+            out.append(NULL)
+        elif value is True:
+            out.append(TRUE)
+        elif value is False:
+            out.append(FALSE)
+        elif isinstance(value, int):
+            out.append(INT)
+            out += I64.pack(value)
+        elif isinstance(value, float):
+            out.append(FLOAT)
+            out += F64.pack(value)
+        elif isinstance(value, str):
+            out.append(STRING)
+            out += U32.pack(self.intern(value))
+        elif isinstance(value, list):
+            out.append(LIST)
+            out += U32.pack(len(value))
+            for element in value:
+                self._encode(element, out)
+        elif isinstance(value, dict):
+            out.append(DICT)
+            out += U32.pack(len(value))
+            for key, element in value.items():
+                out += U32.pack(self.intern(key))
+                self._encode(element, out)
+        else:
+            raise PackError(f"Cannot pack {type(value).__name__}")
+
+    def add(self, name: str, value: Any):
+        offset = len(self.data)
+        self._encode(value, self.data)
+        self.records.append((self.intern(name), offset, len(self.data) - offset))
+
+    def write(self, path: Path) -> bool:
+        names = sorted(self.strings, key=self.strings.get)
+        blobs = [name.encode("utf-8") for name in names]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+
+        data_offset = HEADER.size
+        strings_offset = data_offset + len(self.data)
+        records_offset = strings_offset + 4 * len(offsets) + offsets[-1]
+        index_offset = records_offset + RECORD.size * len(self.records)
+        order = sorted(range(len(self.records)), key=lambda i: blobs[self.records[i][0]])
+
+        writer = AtomicWriter(path, binary=True)
+        with writer as f:
+            f.write(HEADER.pack(MAGIC, PACK_VERSION, len(names), len(self.records),
+                                strings_offset, records_offset, index_offset))
+            f.write(self.data)
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            f.write(b"".join(blobs))
+            for name_ref, offset, length in self.records:
+                f.write(RECORD.pack(name_ref, data_offset + offset, length))
+            f.write(struct.pack(f"<{len(order)}I", *order))
+        return writer.changed
+
+
+def export_corpus(path: Path = PACK_PATH, project_root: Path = PROJECT_ROOT) -> dict:
+    """Pack every source in SOURCES into ``path``. Returns counts for reporting."""
+    writer = PackWriter()
+    manifest = {}
+    for collection, pattern, split in SOURCES:
+        files = sorted(glob.glob(str(Path(project_root) / pattern)))
+        if not split:
+            manifest[collection] = {"files": []}
+            for json_file in files:
+                stem = Path(json_file).stem
+                with open(json_file, "r", encoding="utf-8") as f:
+                    writer.add(f"{collection}/{stem}", json.load(f))
+                manifest[collection]["files"].append(str(Path(json_file).relative_to(project_root)))
+            continue
+
+        if not files:
+            continue
+        with open(files[0], "r", encoding="utf-8") as f:
+            document = json.load(f)
+        items = document.get("content", {}).get("items", [])
+        names = []
+        for i, item in enumerate(items):
+            item_id = item.get("id") if isinstance(item, dict) else None
+            name = f"{collection}/{item_id}" if item_id is not None else f"{collection}/#{i}"
+            if name in names:
+                name = f"{collection}/#{i}"
+            names.append(name)
+            writer.add(name, item)
+        document["content"] = {**document["content"], "items": []}
+        writer.add(f"{collection}/{ROOT}", document)
+        manifest[collection] = {"path": pattern, "items": names}
+
+    writer.add(MANIFEST, manifest)
+    changed = writer.write(path)
+    return {"records": len(writer.records), "strings": len(writer.strings), "changed": changed}
+
+
+# -- Reading ------------------------------------------------------------------
+
+class CorpusPack:
+    """Memory-mapped pack; records are decoded only when asked for."""
+
+    def __init__(self, path: Path = PACK_PATH):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n_strings, self.n_records, self.strings_offset, self.records_offset, \
+            self.index_offset = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != PACK_VERSION:
+            self.close()
+            raise PackError(f"{self.path} is not a version {PACK_VERSION} corpus pack")
+        self.blob_offset = self.strings_offset + 4 * (self.n_strings + 1)
+        self._strings: dict[int, str] = {}
+
+    def close(self):
+        self.buf.close()
+        self._file.close()
+
+    def __enter__(self) -> "CorpusPack":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_records
+
+    def string(self, ref: int) -> str:
+        text = self._strings.get(ref)
+        if text is None:
+            start, end = struct.unpack_from("<II", self.buf, self.strings_offset + 4 * ref)
+            text = self._strings[ref] = self.buf[self.blob_offset + start:self.blob_offset + end].decode("utf-8")
+        return text
+
+    def _record(self, number: int) -> tuple[int, int, int]:
+        return RECORD.unpack_from(self.buf, self.records_offset + RECORD.size * number)
+
+    def _decode(self, pos: int) -> tuple[Any, int]:
+        tag = self.buf[pos]
+        pos += 1
+        if tag == STRING:
+            return self.string(U32.unpack_from(self.buf, pos)[0]), pos + 4
+        if tag == DICT:
+            (count,) = U32.unpack_from(self.buf, pos)
+            pos += 4
+            obj = {}
+            for _ in range(count):
+                key = self.string(U32.unpack_from(self.buf, pos)[0])
+                obj[key], pos = self._decode(pos + 4)
+            return obj, pos
+        if tag == LIST:
+            (count,) = U32.unpack_from(self.buf, pos)
+            pos += 4
+            arr = []
+            for _ in range(count):
+                value, pos = self._decode(pos)
+                arr.append(value)
+            return arr, pos
+        if tag == INT:
+            return I64.unpack_from(self.buf, pos)[0], pos + 8
+        if tag == FLOAT:
+            return F64.unpack_from(self.buf, pos)[0], pos + 8
+        if tag in (NULL, FALSE, TRUE):
+            return (None, False, True)[tag], pos
+        raise PackError(f"Corrupt pack: unknown tag {tag} at {pos - 1}")
+
+    def names(self) -> Iterator[str]:
+        """Record names in source order."""
+        for number in range(self.n_records):
+            yield self.string(self._record(number)[0])
+
+    def find(self, name: str) -> int | None:
+        """Record number for ``name`` (binary search over the sorted index)."""
+        target = name.encode("utf-8")
+        lo, hi = 0, self.n_records
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (number,) = U32.unpack_from(self.buf, self.index_offset + 4 * mid)
+            candidate = self.string(self._record(number)[0]).encode("utf-8")
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return number
+        return None
+
+    def get(self, name: str, default: Any = None) -> Any:
+        number = self.find(name)
+        if number is None:
+            return default
+        return self._decode(self._record(number)[1])[0]
+
+    def __getitem__(self, name: str) -> Any:
+        number = self.find(name)
+        if number is None:
+            raise KeyError(name)
+        return self._decode(self._record(number)[1])[0]
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def document(self, collection: str) -> Any:
+        """Reassemble a split collection into its original document."""
+        document = self[f"{collection}/{ROOT}"]
+        document["content"]["items"] = [self[name] for name in self[MANIFEST][collection]["items"]]
+        return document
+
+
+def import_corpus(pack: CorpusPack, output_dir: Path = PROJECT_ROOT) -> list[Path]:
+    """Write the packed sources back as JSON under ``output_dir``. Returns the paths written."""
+    written = []
+    for collection, entry in pack[MANIFEST].items():
+        if "files" in entry:
+            documents = [(path, pack[f"{collection}/{Path(path).stem}"]) for path in entry["files"]]
+        else:
+            documents = [(entry["path"], pack.document(collection))]
+        for path, document in documents:
+            target = Path(output_dir) / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            writer = AtomicWriter(target)
+            with writer as f:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+            written.append(target)
+    return written
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Pack the corpus into a binary container, or read it back")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export", help="Pack the JSON sources")
+    export_parser.add_argument("--output", type=Path, default=PACK_PATH)
+    get_parser = sub.add_parser("get", help="Print one record as JSON")
+    get_parser.add_argument("name")
+    get_parser.add_argument("--pack", type=Path, default=PACK_PATH)
+    import_parser = sub.add_parser("import", help="Write the packed sources back as JSON")
+    import_parser.add_argument("--pack", type=Path, default=PACK_PATH)
+    import_parser.add_argument("--output-dir", type=Path, default=PROJECT_ROOT)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        start = time.perf_counter()
+        stats = export_corpus(args.output)
+        elapsed = time.perf_counter() - start
+        print(f"Packed {stats['records']} records, {stats['strings']} distinct strings "
+              f"({args.output.stat().st_size:,} bytes) in {elapsed * 1000:.1f} ms")
+        if not stats["changed"]:
+            print("Pack unchanged")
+    elif args.command == "get":
+        with CorpusPack(args.pack) as pack:
+            if args.name not in pack:
+                parser.exit(1, f"No record named {args.name!r}\n")
+            print(json.dumps(pack[args.name], ensure_ascii=False, indent=2))
+    else:
+        with CorpusPack(args.pack) as pack:
+            for path in import_corpus(pack, args.output_dir):
+                print(f"✓ Written: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Single-pass extraction engine for shahr_ramadan_translated.json.
+
+extract_calendar.py, extract_common_acts.py and generate_ramadan_data.py
+each parse the translated source (or a file derived from it) and walk the
+tree again. This engine parses the source once, visits every section node
+once in document order, and hands matching sections to pluggable handlers
+which then emit their outputs:
+
+  calendar     -> ramadan_calendar.json       (section titled 'تقويم هذا الشهر:')
+  common_acts  -> common_acts_ramadan.json    (the Common Acts section)
+  ramadan_data -> app/src/data/ramadan_extracted.ts (duas segmented from Common Acts)
+                  and app/src/data/footnotes.json (the footnotes they reference)
+
+Handlers run in registration order for each node, so a later handler sees
+any changes an earlier one made to a shared section (ramadan_data relies on
+common_acts having restored the hand-written ``custom_title`` values).
+
+Usage:
+    python tools/extract_sections.py                   # run every handler
+    python tools/extract_sections.py --only calendar   # run selected handlers
+    python tools/extract_sections.py --compare         # also time the three-script approach
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SOURCE_PATH = PROJECT_ROOT / "shahr_ramadan_translated.json"
+CALENDAR_PATH = PROJECT_ROOT / "ramadan_calendar.json"
+COMMON_ACTS_PATH = PROJECT_ROOT / "common_acts_ramadan.json"
+RAMADAN_DATA_PATH = PROJECT_ROOT / "app" / "src" / "data" / "ramadan_extracted.ts"
+FOOTNOTES_PATH = PROJECT_ROOT / "app" / "src" / "data" / "footnotes.json"
+
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+from extract_calendar import CALENDAR_TITLE, build_calendar  # noqa: E402
+from extract_common_acts import COMMON_ACTS_TITLE, build_common_acts, restore_custom_titles  # noqa: E402
+from footnotes import FootnoteTable  # noqa: E402
+from generate_ramadan_data import render_typescript, segment_common_acts  # noqa: E402
+from title_index import TitleIndex, load_pointer  # noqa: E402
+from ts_emitter import AtomicWriter, write_chunks  # noqa: E402
+
+
+def write_json(path: Path, data) -> bool:
+    writer = AtomicWriter(path)
+    with writer as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return writer.changed
+
+
+class SectionHandler:
+    """
+    Base class for extraction handlers.
+
+    ``matches`` is called for every titled section during the walk; the
+    first matching section is passed to ``handle``. ``finish`` writes the
+    output once the walk is complete and returns the paths it changed.
+    ``footnotes`` is the source's footnote table, shared by all handlers.
+    """
+
+    name = ""
+
+    def __init__(self, footnotes: FootnoteTable | None = None):
+        self.section = None
+        self.footnotes = footnotes
+
+    def matches(self, section: dict) -> bool:
+        raise NotImplementedError
+
+    def handle(self, section: dict, metadata: dict):
+        self.section = section
+
+    def finish(self, metadata: dict) -> list[Path]:
+        raise NotImplementedError
+
+
+class CalendarHandler(SectionHandler):
+    name = "calendar"
+
+    def matches(self, section):
+        return section.get("title") == CALENDAR_TITLE
+
+    def finish(self, metadata):
+        # The calendar keeps its own footnotes, out of the app's footnotes.json
+        calendar = build_calendar(metadata, self.section, self.footnotes.unlinked())
+        changed = write_json(CALENDAR_PATH, calendar)
+        return [CALENDAR_PATH] if changed else []
+
+
+class CommonActsHandler(SectionHandler):
+    name = "common_acts"
+
+    def matches(self, section):
+        return COMMON_ACTS_TITLE in section.get("title", "")
+
+    def handle(self, section, metadata):
+        # Restored on the shared section, so ramadan_data segments with the custom titles too
+        self.section = restore_custom_titles(section, COMMON_ACTS_PATH)
+
+    def finish(self, metadata):
+        changed = write_json(COMMON_ACTS_PATH, build_common_acts(metadata, self.section))
+        return [COMMON_ACTS_PATH] if changed else []
+
+
+class RamadanDataHandler(SectionHandler):
+    name = "ramadan_data"
+
+    def matches(self, section):
+        return COMMON_ACTS_TITLE in section.get("title", "")
+
+    def finish(self, metadata):
+        duas = segment_common_acts(self.section.get("items", []), footnotes=self.footnotes)
+        changed = []
+        if write_chunks(RAMADAN_DATA_PATH, [render_typescript(duas)]):
+            changed.append(RAMADAN_DATA_PATH)
+        if self.footnotes.write_json(FOOTNOTES_PATH):
+            changed.append(FOOTNOTES_PATH)
+        return changed
+
+
+HANDLERS = {handler.name: handler for handler in (CalendarHandler, CommonActsHandler, RamadanDataHandler)}
+
+
+def walk_sections(root: dict):
+    """Yield every titled node reachable through ``items`` lists, in document order, once."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if "title" in node:
+            yield node
+        children = node.get("items")
+        if isinstance(children, list):
+            stack.extend(child for child in reversed(children) if isinstance(child, dict))
+
+
+def run(handler_names=None) -> dict:
+    """Parse the source once, dispatch sections to handlers and write their outputs."""
+    timings = {}
+
+    start = time.perf_counter()
+    with open(SOURCE_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    timings["parse"] = time.perf_counter() - start
+
+    footnotes = FootnoteTable(data.get("footnotes", {}))
+    handlers = [HANDLERS[name](footnotes) for name in (handler_names or HANDLERS)]
+
+    metadata = data.get("metadata", {})
+    start = time.perf_counter()
+    pending = list(handlers)
+    for section in walk_sections(data.get("content", {})):
+        for handler in list(pending):
+            if handler.matches(section):
+                handler.handle(section, metadata)
+                pending.remove(handler)
+        if not pending:
+            break
+    timings["walk"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    changed = []
+    for handler in handlers:
+        if handler.section is None:
+            print(f"✗ {handler.name}: section not found")
+            continue
+        changed.extend(handler.finish(metadata))
+    timings["emit"] = time.perf_counter() - start
+
+    return {"timings": timings, "changed": changed, "missing": [h.name for h in handlers if h.section is None]}
+
+
+def time_separate_scripts() -> float:
+    """Time the reads and lookups of the three standalone scripts (without writing)."""
+    start = time.perf_counter()
+
+    # extract_calendar.py: streamed metadata, cached title index, streamed section
+    load_pointer(SOURCE_PATH, "/metadata")
+    pointer = TitleIndex.for_source(SOURCE_PATH).find_first(CALENDAR_TITLE)
+    load_pointer(SOURCE_PATH, pointer)
+
+    # extract_common_acts.py: the same, with a substring lookup
+    load_pointer(SOURCE_PATH, "/metadata")
+    pointer = TitleIndex.for_source(SOURCE_PATH).find_first(COMMON_ACTS_TITLE, substring=True)
+    load_pointer(SOURCE_PATH, pointer)
+
+    # generate_ramadan_data.py reads the extracted file, then the source's footnotes
+    with open(COMMON_ACTS_PATH, "r", encoding="utf-8") as f:
+        json.load(f)
+    FootnoteTable.from_source(SOURCE_PATH)
+
+    return time.perf_counter() - start
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract all sections from the translated source in one pass")
+    parser.add_argument("--only", action="append", choices=list(HANDLERS), help="Run only the given handler(s)")
+    parser.add_argument("--compare", action="store_true", help="Also time the three separate scripts")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run(args.only)
+    total = time.perf_counter() - start
+
+    for path in result["changed"]:
+        print(f"✓ Written: {path}")
+    timings = result["timings"]
+    print(f"Single pass: {total * 1000:.1f} ms "
+          f"(parse {timings['parse'] * 1000:.1f} ms, walk {timings['walk'] * 1000:.1f} ms, "
+          f"emit {timings['emit'] * 1000:.1f} ms)")
+
+    if args.compare:
+        separate = time_separate_scripts()
+        single = timings["parse"] + timings["walk"]
+        print(f"Parse + search, one parse:    {single * 1000:.1f} ms")
+        print(f"Parse + search, three parses: {separate * 1000:.1f} ms ({separate / single:.1f}x)")
+
+    sys.exit(1 if result["missing"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Debounced file change notifications for the generators' watch modes.
+
+On Linux the kernel's inotify interface is used directly (through ctypes,
+so nothing needs installing); anywhere else, or if inotify cannot be set
+up, the watched paths are polled by mtime and size. Either way editors'
+bursts of events (write, rename-over, touch) are coalesced: a batch is
+yielded once no new change has arrived for ``debounce`` seconds.
+
+Watched directories report changes to files matching ``pattern``;
+watched files are matched by path (their directory is watched, so
+atomic rename-over saves are seen too).
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Targets:
+    """Which paths are of interest: whole directories (by pattern) or single files."""
+
+    def __init__(self, paths: Iterable[Path], pattern: str):
+        self.pattern = pattern
+        self.dirs: set[Path] = set()
+        self.files: set[Path] = set()
+        for path in paths:
+            path = Path(path).resolve()
+            (self.dirs if path.is_dir() else self.files).add(path)
+
+    def watched_dirs(self) -> set[Path]:
+        return self.dirs | {path.parent for path in self.files}
+
+    def matches(self, path: Path) -> bool:
+        return path in self.files or (path.parent in self.dirs and fnmatch.fnmatch(path.name, self.pattern))
+
+    def snapshot(self) -> dict[Path, tuple[int, int]]:
+        state = {}
+        candidates = [p for d in self.dirs for p in d.glob(self.pattern)] + list(self.files)
+        for path in candidates:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+
+class _Inotify:
+    def __init__(self, dirs: set[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+        for directory in dirs:
+            wd = libc.inotify_add_watch(self.fd, str(directory).encode(), IN_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.dirs[wd] = directory
+
+    def read(self, timeout: float | None) -> set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        buf = os.read(self.fd, 1 << 16)
+        paths = set()
+        pos = 0
+        while pos < len(buf):
+            wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(buf, pos)
+            pos += EVENT_HEADER.size
+            name = buf[pos:pos + length].rstrip(b"\0").decode(errors="surrogateescape")
+            pos += length
+            if name and wd in self.dirs:
+                paths.add(self.dirs[wd] / name)
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    Iterating yields sets of changed (created, modified or deleted) paths,
+    forever. ``interval`` is the polling period when inotify is not used;
+    ``backend`` says which one is.
+    """
+
+    def __init__(self, paths: Iterable[Path], pattern: str = "*.json", debounce: float = 0.1,
+                 interval: float = 0.25, polling: bool = False):
+        self.targets = _Targets(paths, pattern)
+        self.debounce = debounce
+        self.interval = interval
+        self.inotify = None
+        if not polling and sys.platform.startswith("linux"):
+            try:
+                self.inotify = _Inotify(self.targets.watched_dirs())
+            except (OSError, AttributeError):
+                self.inotify = None
+        self.backend = "inotify" if self.inotify else "polling"
+
+    def __iter__(self) -> Iterator[set[Path]]:
+        if self.inotify is not None:
+            return _inotify_batches(self.inotify, self.targets, self.debounce)
+        return _polling_batches(self.targets, self.debounce, self.interval)
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+
+def _inotify_batches(inotify: _Inotify, targets: _Targets, debounce: float) -> Iterator[set[Path]]:
+    while True:
+        batch = {path for path in inotify.read(None) if targets.matches(path)}
+        if not batch:
+            continue
+        # Keep collecting until the burst of events has settled
+        while True:
+            more = inotify.read(debounce)
+            if not more:
+                break
+            batch.update(path for path in more if targets.matches(path))
+        yield batch
+
+
+def _polling_batches(targets: _Targets, debounce: float, interval: float) -> Iterator[set[Path]]:
+    state = targets.snapshot()
+    batch: set[Path] = set()
+    last_change = 0.0
+    while True:
+        time.sleep(debounce if batch else interval)
+        current = targets.snapshot()
+        changed = {path for path in state.keys() | current.keys() if state.get(path) != current.get(path)}
+        state = current
+        if changed:
+            batch |= changed
+            last_change = time.monotonic()
+        elif batch and time.monotonic() - last_change >= debounce:
+            yield batch
+            batch = set()
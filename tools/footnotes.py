@@ -0,0 +1,106 @@
+"""
+Footnote resolution for the translated source.
+
+shahr_ramadan_translated.json keeps every footnote once, in its top-level
+``footnotes`` object (``content_note_469_1 -> "1- منتهى الآمال: ..."``), and
+items point at them through ``footnote_refs``. A FootnoteTable maps those
+ref ids to :class:`models.Footnote` objects, which also record, in the
+other direction, which generated items reference each footnote.
+
+Generated items carry only the footnote ids; the texts are written once to
+a separate table (app/src/data/footnotes.json) that the app loads when a
+footnote is first shown, so a footnote shared by several items is neither
+copied per item nor loaded up front. scripts/extract_calendar.py links its
+events the same way but keeps the texts in ramadan_calendar.json itself.
+The DuaAmaal sources read by generate_data.py carry no footnote refs.
+"""
+
+import json
+import re
+from pathlib import Path
+
+from models import Footnote
+from title_index import load_pointer
+from ts_emitter import AtomicWriter
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SOURCE_PATH = PROJECT_ROOT / "shahr_ramadan_translated.json"
+OUTPUT_PATH = PROJECT_ROOT / "app" / "src" / "data" / "footnotes.json"
+
+# Source texts start with their note number: "1- منتهى الآمال ..."
+NUMBER_PREFIX_RE = re.compile(r"^\s*\d+\s*-\s*")
+
+
+class FootnoteTable:
+    """Footnote id -> Footnote, each with the ids of the generated items referencing it."""
+
+    def __init__(self, footnotes: dict[str, str]):
+        self.footnotes = {
+            ref_id: Footnote(ref_id, NUMBER_PREFIX_RE.sub("", text).strip())
+            for ref_id, text in footnotes.items()
+        }
+        # Footnotes with at least one reference, in first-reference order
+        self.referenced: list[Footnote] = []
+        self.unresolved: set[str] = set()
+
+    @classmethod
+    def from_source(cls, source_path: Path = SOURCE_PATH) -> "FootnoteTable":
+        """Read only the ``footnotes`` object of the translated source."""
+        return cls(load_pointer(source_path, "/footnotes") or {})
+
+    def unlinked(self) -> "FootnoteTable":
+        """The same footnotes with no references, for an output that keeps its own table."""
+        table = FootnoteTable({})
+        table.footnotes = {ref_id: Footnote(ref_id, footnote.text) for ref_id, footnote in self.footnotes.items()}
+        return table
+
+    def resolve(self, ref_id: str) -> str | None:
+        footnote = self.footnotes.get(ref_id)
+        return footnote.text if footnote else None
+
+    def link(self, item_id: str, refs: list[dict]) -> list[str]:
+        """
+        Record that ``item_id`` references the footnotes in ``refs`` (source
+        ``footnote_refs`` entries) and return their ids. A ref missing from
+        the table falls back to the text copied into the ref's ``title``.
+        """
+        ids = []
+        for ref in refs:
+            ref_id = ref.get("ref_id")
+            if not ref_id or ref_id in ids:
+                continue
+            footnote = self.footnotes.get(ref_id)
+            if footnote is None:
+                if not ref.get("title"):
+                    self.unresolved.add(ref_id)
+                    continue
+                footnote = self.footnotes[ref_id] = Footnote(ref_id, ref["title"].strip())
+            ids.append(footnote.id)
+            if not footnote.referenced_by:
+                self.referenced.append(footnote)
+            if item_id not in footnote.referenced_by:
+                footnote.referenced_by.append(item_id)
+        return ids
+
+    def relink(self, old_id: str, new_id: str):
+        """Move ``old_id``'s references to ``new_id`` (when items are merged)."""
+        for footnote in self.referenced:
+            if old_id not in footnote.referenced_by:
+                continue
+            if new_id in footnote.referenced_by:
+                footnote.referenced_by.remove(old_id)
+            else:
+                footnote.referenced_by[footnote.referenced_by.index(old_id)] = new_id
+
+    def to_dict(self) -> dict:
+        """Only footnotes that some item references, in first-reference order."""
+        return {
+            "footnotes": {footnote.id: footnote.text for footnote in self.referenced},
+            "referencedBy": {footnote.id: footnote.referenced_by for footnote in self.referenced},
+        }
+
+    def write_json(self, path: Path = OUTPUT_PATH) -> bool:
+        writer = AtomicWriter(path)
+        with writer as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        return writer.changed
@@ -2,85 +2,217 @@
 import json
 import os
 import glob
+import sys
+import time
 from pathlib import Path
 
-def generate_data():
-    project_root = Path(__file__).parent.parent
-    dua_amaal_dir = project_root / "DuaAmaal"
-    common_acts_path = project_root / "common_acts_ramadan.json"
-    output_path = project_root / "app/src/data/ramadan_extracted.ts"
+from build_cache import CACHE_DIR, BuildCache
+from instrumentation import Instrumentation
+from item_chunks import write_split_output
+from models import item_from_source
+from precache import add_arguments as add_precache_arguments
+from publish import publish_data
+from schedule_index import ScheduleIndex, load_content_order, order_key
+from schema import validate_corpus
+from ts_emitter import iter_ts_const, write_chunks
 
-    duas = []
-    aamal = []
+TS_HEADER = """// Auto-generated by tools/generate_data.py
+// DO NOT EDIT DIRECTLY
 
-    # 1. Process individual JSON files in DuaAmaal/
-    json_files = glob.glob(str(dua_amaal_dir / "*.json"))
+export interface Phrase {
+  arabic: string;
+  english: string;
+  transliteration?: string;
+}
+
+export interface Dua {
+  id: string;
+  name: string;
+  arabicName: string;
+  description: string;
+  level: 1 | 2 | 3;
+  source: string;
+  applicableDays: 'all' | number[];
+  type: 'dua';
+  // Content can be either phrased or block text
+  phrases?: Phrase[];
+  arabicText?: string;
+  englishTranslation?: string;
+  transliteration?: string;
+  preamble?: string;
+  postamble?: string;
+}
+
+export interface Aamal {
+  id: string;
+  name: string;
+  arabicName: string;
+  description: string;
+  level: 1 | 2 | 3;
+  source: string;
+  applicableDays: 'all' | number[];
+  type: 'aamal';
+  timing?: string;
+  instructions?: string[];
+  // Content
+  phrases?: Phrase[];
+  arabicText?: string;
+  englishTranslation?: string;
+  transliteration?: string;
+}
+
+"""
+
+# Bump when the normalisation in models.py changes so cached items are rebuilt
+NORMALISE_VERSION = "3"
+
+
+def normalise_item(data, json_file):
+    """Map a raw DuaAmaal JSON document to the application interface."""
+    return item_from_source(data, Path(json_file).stem).to_dict()
+
+
+def process_file(json_file):
+    """
+    Parse and normalise a single DuaAmaal file.
+
+    Runs in a worker process when ``--jobs`` is used, so failures are
+    returned as a structured result rather than raised or printed.
+    """
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {"file": json_file, "item": normalise_item(data, json_file), "error": None}
+    except Exception as e:
+        return {"file": json_file, "item": None, "error": {"type": type(e).__name__, "message": str(e)}}
+
+
+def iter_typescript(duas, aamal):
+    """Yield ramadan_extracted.ts in chunks, one record at a time."""
+    yield TS_HEADER
+    yield from iter_ts_const("duas", "Dua[]", duas)
+    yield "\n"
+    yield from iter_ts_const("aamal", "Aamal[]", aamal)
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DUA_AMAAL_DIR = PROJECT_ROOT / "DuaAmaal"
+OUTPUT_PATH = PROJECT_ROOT / "app/src/data/ramadan_extracted.ts"
+ITEMS_DIR = PROJECT_ROOT / "app/src/data/items"
+SCHEDULE_PATH = PROJECT_ROOT / "app/src/data/day_schedule.json"
+CONTENT_ORDER_PATH = PROJECT_ROOT / "app/src/data/content_order.json"
+
+
+def load_items(json_files, cache, jobs=1):
+    """
+    Normalise ``json_files``, reusing cached items for unchanged files.
+    Returns ``({file: item}, errors)``; the cache is updated but not saved.
+    """
+    items = {}
+    errors = []
+    pending = {}
     for json_file in json_files:
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Determine if it's a Dua or Amaal (default to Dua for now if not specified)
-                content_type = data.get('content_type', 'dua').lower()
-                
-                # Parse Level (Handle "L1", "L2", "L3" strings)
-                raw_level = data.get('level', 1)
-                level = 1
-                if isinstance(raw_level, str):
-                    if raw_level.upper() == 'L1': level = 1
-                    elif raw_level.upper() == 'L2': level = 2
-                    elif raw_level.upper() == 'L3': level = 3
-                    else: 
-                        # Try to parse number from string
-                        try:
-                            level = int(raw_level.replace('L', ''))
-                        except:
-                            level = 1
-                elif isinstance(raw_level, int):
-                    level = raw_level
-
-                # Determine description (Prioritize 'description' field)
-                description = data.get('description', '')
-                
-                # Determine preamble
-                preamble = ''
-                if isinstance(data.get('preamble'), dict):
-                     preamble = data.get('preamble', {}).get('english', '')
-                else:
-                     preamble = str(data.get('preamble', ''))
-
-                if not description:
-                     # Fallback to preamble for description if missing
-                     description = preamble
-
-                # Map to application interface
-                item = {
-                    "id": data.get('id', Path(json_file).stem),
-                    "name": data.get('title', 'Unknown Title'),
-                    "arabicName": data.get('arabic_title', ''), 
-                    "description": description,
-                    "level": level,
-                    "source": data.get('source', 'Mafatih al-Jinan'), 
-                    "applicableDays": data.get('applicable_days', 'all'),
-                    "phrases": data.get('phrases', []),
-                    "type": content_type,
-                    "preamble": preamble  # Explicitly add preamble
-                }
-
-                if content_type in ['dua', 'ziyarat', 'supplication']:
-                    item['type'] = 'dua' # Normalize to 'dua' for TS interface
-                    duas.append(item)
-                elif content_type in ['aamal', "a'amal", 'act']:
-                    item['instructions'] = data.get('instructions', [])
-                    item['type'] = 'aamal' # Normalize
-                    aamal.append(item)
-                else:
-                    # Fallback to Dua
-                     item['type'] = 'dua'
-                     duas.append(item)
-
-        except Exception as e:
-            print(f"Error processing {json_file}: {e}")
+            item, fingerprint = cache.lookup(json_file)
+        except OSError as e:
+            errors.append({"file": json_file, "type": type(e).__name__, "message": str(e)})
+            continue
+        if item is None:
+            pending[json_file] = fingerprint
+        else:
+            items[json_file] = item
+
+    if jobs > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(process_file, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+    else:
+        results = [process_file(json_file) for json_file in pending]
+
+    for result in results:
+        if result["error"]:
+            errors.append({"file": result["file"], **result["error"]})
+            continue
+        cache.store(result["file"], pending[result["file"]], result["item"])
+        items[result["file"]] = result["item"]
+
+    return items, errors
+
+
+def write_outputs(items, content_order, split=False, changed_ids=None, instr=None, page_size=None):
+    """
+    Write ramadan_extracted.ts, the day schedule and (with ``split``) the
+    per-item chunks, paged by ``page_size``. ``changed_ids`` limits which
+    chunks are re-serialised. Returns the sorted ``(duas, aamal)``.
+    """
+    instr = instr or Instrumentation("write_outputs")
+    # Merge deterministically regardless of cache hits or worker scheduling
+    with instr.stage("sort") as stage:
+        items = sorted(items, key=order_key(content_order))
+        duas = [item for item in items if item['type'] != 'aamal']
+        aamal = [item for item in items if item['type'] == 'aamal']
+        stage.items = len(items)
+
+    # Generate TypeScript File (streamed to a temp file, renamed into place)
+    with instr.stage("emit_ts", len(items)):
+        written = write_chunks(OUTPUT_PATH, iter_typescript(duas, aamal))
+    if written:
+        print(f"Successfully generated data to {OUTPUT_PATH}")
+    else:
+        print(f"{OUTPUT_PATH} is already up to date")
+
+    # Precomputed day -> item id schedule
+    with instr.stage("schedule", len(items)):
+        written = ScheduleIndex.from_items(items, content_order).write_json(SCHEDULE_PATH)
+    if written:
+        print(f"Updated day schedule: {SCHEDULE_PATH}")
+
+    # Optionally split into an index module plus one lazily loaded chunk per item
+    if split:
+        with instr.stage("split", len(items)):
+            stats = write_split_output(duas + aamal, ITEMS_DIR, changed_ids, page_size)
+        pages = f" + {stats['pages']} phrase page(s)" if page_size else ""
+        print(f"Split output: {stats['chunks']} chunk(s){pages} in {ITEMS_DIR} "
+              f"({stats['written']} written, {stats['removed']} removed)")
+    return duas, aamal
+
+
+def print_errors(errors):
+    print(f"{len(errors)} file(s) failed to process:", file=sys.stderr)
+    for error in errors:
+        print(f"  {Path(error['file']).name}: {error['type']}: {error['message']}", file=sys.stderr)
+
+
+def generate_data(use_cache=True, jobs=1, split=False, profile=False, page_size=None, validate=True):
+    with Instrumentation("generate_data", profile) as instr:
+        return _generate_data(instr, use_cache, jobs, split, page_size, validate)
+
+
+def _generate_data(instr, use_cache, jobs, split, page_size, validate=True):
+    common_acts_path = PROJECT_ROOT / "common_acts_ramadan.json"
+
+    cache = BuildCache(CACHE_DIR / "generate_data.json", salt=NORMALISE_VERSION)
+    if not use_cache:
+        cache.entries = {}
+
+    # 1. Process individual JSON files in DuaAmaal/
+    # Sorted so the output does not depend on filesystem ordering
+    json_files = sorted(glob.glob(str(DUA_AMAAL_DIR / "*.json")))
+    if validate:
+        # Nothing is written while the sources do not match the schema
+        with instr.stage("validate", len(json_files)):
+            report = validate_corpus(json_files, CONTENT_ORDER_PATH, jobs, use_cache)
+        if not report.ok:
+            print(report.format(), file=sys.stderr)
+            errors = [{"file": problem.file, "type": "SchemaError", "message": f"{problem.pointer or '/'}: {problem.message}"}
+                      for problem in report.problems]
+            return {"duas": 0, "aamal": 0, "errors": errors}
+
+    with instr.stage("load", len(json_files)):
+        items, errors = load_items(json_files, cache, jobs)
+        cache.prune({Path(p).name for p in json_files})
+        cache.save()
 
     # 2. Process common_acts_ramadan.json (Legacy/Aggregated source) - EXCLUDED PER USER REQUEST
     # if common_acts_path.exists():
@@ -135,63 +267,134 @@ def generate_data():
     #     except Exception as e:
     #         print(f"Error processing common stats: {e}")
 
-    # 3. Generate TypeScript File
-    ts_content = f"""// Auto-generated by tools/generate_data.py
-// DO NOT EDIT DIRECTLY
+    print(f"Parsed {cache.misses} changed file(s), reused {cache.hits} from cache")
 
-export interface Phrase {{
-  arabic: string;
-  english: string;
-  transliteration?: string;
-}}
+    # 3. Write the TypeScript module, day schedule and optional chunks
+    with instr.stage("write", len(items)):
+        duas, aamal = write_outputs(items.values(), load_content_order(PROJECT_ROOT), split,
+                                    instr=instr, page_size=page_size)
+    print(f"Duas: {len(duas)}")
+    print(f"Aamal: {len(aamal)}")
 
-export interface Dua {{
-  id: string;
-  name: string;
-  arabicName: string;
-  description: string;
-  level: 1 | 2 | 3;
-  source: string;
-  applicableDays: 'all' | number[];
-  type: 'dua';
-  // Content can be either phrased or block text
-  phrases?: Phrase[];
-  arabicText?: string;
-  englishTranslation?: string;
-  transliteration?: string;
-  preamble?: string;
-  postamble?: string;
-}}
+    if errors:
+        print_errors(errors)
 
-export interface Aamal {{
-  id: string;
-  name: string;
-  arabicName: string;
-  description: string;
-  level: 1 | 2 | 3;
-  source: string;
-  applicableDays: 'all' | number[];
-  type: 'aamal';
-  timing?: string;
-  instructions?: string[];
-  // Content
-  phrases?: Phrase[];
-  arabicText?: string;
-  englishTranslation?: string;
-  transliteration?: string;
-}}
+    return {"duas": len(duas), "aamal": len(aamal), "errors": errors}
 
-export const duas: Dua[] = {json.dumps(duas, indent=2, ensure_ascii=False)};
 
-export const aamal: Aamal[] = {json.dumps(aamal, indent=2, ensure_ascii=False)};
-"""
+def watch(split=False, polling=False, debounce=0.1, page_size=None, validate=True):
+    """
+    Rebuild whenever a DuaAmaal file or content_order.json changes.
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(ts_content)
+    The normalised corpus stays in memory between rebuilds: a change only
+    re-normalises the files that changed, and only their chunks are
+    re-serialised. With ``validate``, the DuaAmaal files and
+    content_order.json are checked against the schema before every build
+    (cheap, as unchanged files are cached); while they fail, the problems
+    are reported and the changes are held back until a later edit fixes
+    them. Runs until interrupted.
+    """
+    from file_watcher import FileWatcher
 
-    print(f"Successfully generated data to {output_path}")
-    print(f"Duas: {len(duas)}")
-    print(f"Aamal: {len(aamal)}")
+    # Resolved paths, so they compare equal to the watcher's
+    dua_amaal_dir = DUA_AMAAL_DIR.resolve()
+    order_path = CONTENT_ORDER_PATH.resolve()
+
+    def sources_valid():
+        if not validate:
+            return True
+        report = validate_corpus(sorted(glob.glob(str(dua_amaal_dir / "*.json"))), order_path)
+        if not report.ok:
+            print(report.format(), file=sys.stderr)
+            print("Not rebuilt; waiting for the problems above to be fixed", file=sys.stderr)
+        return report.ok
+
+    def full_build():
+        json_files = sorted(glob.glob(str(dua_amaal_dir / "*.json")))
+        items, errors = load_items(json_files, cache)
+        cache.prune({Path(p).name for p in json_files})
+        cache.save()
+        write_outputs(items.values(), content_order, split, page_size=page_size)
+        if errors:
+            print_errors(errors)
+        return items
+
+    cache = BuildCache(CACHE_DIR / "generate_data.json", salt=NORMALISE_VERSION)
+    content_order = load_content_order(PROJECT_ROOT)
+    # None until the first build, which waits for the sources to validate
+    items = full_build() if sources_valid() else None
+    # Changes held back while the sources fail validation
+    pending = set()
+
+    watcher = FileWatcher([dua_amaal_dir, order_path], debounce=debounce, polling=polling)
+    print(f"Watching {dua_amaal_dir} and {order_path.name} ({watcher.backend}); Ctrl+C to stop")
+    try:
+        for changed in watcher:
+            start = time.perf_counter()
+            pending.update(changed)
+            if not sources_valid():
+                continue
+            changed, pending = pending, set()
+            if order_path in changed:
+                content_order = load_content_order(PROJECT_ROOT)
+            if items is None:
+                items = full_build()
+                print(f"Built in {(time.perf_counter() - start) * 1000:.1f} ms")
+                continue
+
+            changed_ids = set()
+            for json_file in sorted(str(path) for path in changed if path.parent == dua_amaal_dir):
+                if not Path(json_file).exists():
+                    if items.pop(json_file, None):
+                        cache.prune({Path(p).name for p in items})
+                        print(f"- {Path(json_file).name}")
+                    continue
+                loaded, errors = load_items([json_file], cache)
+                if errors:
+                    print_errors(errors)
+                    continue
+                item = loaded[json_file]
+                items[json_file] = item
+                changed_ids.add(item["id"])
+                print(f"~ {Path(json_file).name}")
+
+            write_outputs(items.values(), content_order, split, changed_ids, page_size=page_size)
+            cache.save()
+            print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
 
 if __name__ == "__main__":
-    generate_data()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate ramadan_extracted.ts from DuaAmaal/")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the build cache and re-parse every file")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes for parsing (default: 1)")
+    parser.add_argument("--split", action="store_true",
+                        help="Also write app/src/data/items/: an index module plus one lazily loaded chunk per item")
+    parser.add_argument("--page-size", type=int, metavar="BYTES",
+                        help="With --split, move the phrases of items larger than BYTES into pages of about that size")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay running and rebuild when DuaAmaal/ or content_order.json changes")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll for changes instead of using inotify")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run (cProfile, tracemalloc) and write a Chrome trace to tools/.cache/profile/")
+    parser.add_argument("--publish", action="store_true",
+                        help="Then publish the data with content-hashed names and its precache manifest (tools/publish.py)")
+    add_precache_arguments(parser)
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Skip the schema check of DuaAmaal/ and content_order.json (see tools/schema.py)")
+    args = parser.parse_args()
+    if args.page_size is not None and not args.split:
+        parser.error("--page-size requires --split")
+    if args.watch:
+        watch(split=args.split, polling=args.poll, page_size=args.page_size, validate=not args.no_validate)
+        sys.exit(0)
+    summary = generate_data(use_cache=not args.no_cache, jobs=args.jobs, split=args.split, profile=args.profile,
+                            page_size=args.page_size, validate=not args.no_validate)
+    if summary["errors"]:
+        sys.exit(1)
+    if args.publish:
+        publish_data(budget_kib=args.budget, max_level=args.max_level)
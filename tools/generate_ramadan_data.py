@@ -1,61 +1,73 @@
+import hashlib
 import json
 import os
 import re
 
-def generate_ramadan_data():
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    input_file = os.path.join(project_root, 'common_acts_ramadan.json')
-    output_file = os.path.join(project_root, 'app', 'src', 'data', 'ramadan_extracted.ts')
+from footnotes import FootnoteTable
+from instrumentation import Instrumentation
+from item_classifier import CACHE_PATH, CONTENT, ItemClassifier
+from models import Dua
+from near_duplicates import MERGE_POLICIES, merge_near_duplicates
 
-    print(f"Reading from {input_file}")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+# Text fields of a dua that grow by one line per content item
+TEXT_FIELDS = ('arabic_text', 'english_translation', 'transliteration')
 
-    items = data['content']['items']
-    duas = []
-    
+
+def content_digest(dua):
+    """Fixed-size digest of a dua's Arabic and English text, used to spot duplicates."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dua.arabic_text.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(dua.english_translation.encode('utf-8'))
+    return digest.digest()
+
+
+def finish_dua(dua, lines):
+    """Join the buffered lines of each text field once, when the dua is complete."""
+    for field in TEXT_FIELDS:
+        setattr(dua, field, "\n".join(lines[field]))
+    return dua
+
+
+def segment_common_acts(items, classifier=None, footnotes=None):
+    """
+    Group the Common Acts items into duas, with preceding instructions as description.
+
+    With a FootnoteTable, each kept dua is linked to the footnotes of its
+    preamble and text and gets their ids in ``footnote_ids``.
+    """
+    return list(iter_common_acts(items, classifier, footnotes))
+
+
+def iter_common_acts(items, classifier=None, footnotes=None):
+    """
+    Yield the duas of segment_common_acts() one at a time. Only the dua
+    being built and one digest per dua yielded so far are held, so memory
+    does not grow with the number of items when the duas are consumed as
+    they come (``items`` may be an iterator too).
+    """
     current_preamble = []
+    preamble_refs = []
     current_dua = None
+    # Footnote refs of the current dua's preamble and text
+    current_refs = None
+    # Lines of the current dua's text fields, joined by finish_dua()
+    current_lines = None
     dua_counter = 1
 
-    # Simple heuristic to identify content vs preamble
-    # If it has transliteration and strict Arabic (not just a short phrase), it's likely content.
-    # Or if type is specifically tagged (but tags are sparse in the snippet).
-    
+    # Content vs preamble is decided by the rule table in item_classifier.py
+    if classifier is None:
+        classifier = ItemClassifier()
+    # Digests rather than full texts, so memory stays flat however long the duas are
     seen_contents = set()
 
     for item in items:
-        valid_item = True
+        label = classifier.classify(item)
         arabic = item.get('arabic', '').strip()
         translit = item.get('transliteration', '').strip()
         english = item.get('english', '').strip()
-        
-        # Heuristics
-        eng_lower = english.lower()
-        is_numbered = bool(re.match(r'^\d+\.', english))
-        
-        # Expanded instruction keywords
-        instruction_keywords = [
-            'saying:', 'say:', 'recite:', 'supplicate', 'narrated', 'said:', 
-            'recommended to', 'reported that', 'peace be upon'
-        ]
-        is_instruction = any(k in eng_lower for k in instruction_keywords)
-        
-        # If it's a short phrase without transliteration, it's likely a header/instruction
-        if not translit and len(arabic) < 50: 
-             # Exception: "Bismillahi..." might be short but is content. 
-             # But usually Duas in this file have translit.
-             is_instruction = True
-
-        is_content = not (is_numbered or is_instruction)
-
-        if "sayyid ibn tawus narrated" in eng_lower:
-            print(f"DEBUG: Item {item.get('id')}: is_instruction={is_instruction}, is_content={is_content}")
-            print(f"DEBUG: Keywords found: {[k for k in instruction_keywords if k in eng_lower]}")
-
-        # refine is_content: must have arabic
-        if not arabic:
-            is_content = False
+        refs = item.get('footnote_refs') or []
+        is_content = label == CONTENT
 
         if is_content:
             if current_dua:
@@ -65,9 +77,10 @@ def generate_ramadan_data():
                 # that is identical to an old one.
                 
                 # Append to existing dua
-                current_dua['arabicText'] += "\n" + arabic
-                current_dua['englishTranslation'] += "\n" + english
-                current_dua['transliteration'] += "\n" + translit
+                current_lines['arabic_text'].append(arabic)
+                current_lines['english_translation'].append(english)
+                current_lines['transliteration'].append(translit)
+                current_refs.extend(refs)
             else:
                 # Start new Dua
                 desc = "\n\n".join(current_preamble)
@@ -82,48 +95,50 @@ def generate_ramadan_data():
                 
                 name = custom_title if custom_title else f'Common Act {dua_counter}'
 
-                new_dua = {
-                    'id': f'common-act-{dua_counter}',
-                    'name': name,
-                    'arabicName': '',
-                    'description': desc,
-                    'level': 1,
-                    'source': 'Mafatih al-Jinan',
-                    'applicableDays': "'all'",
-                    'arabicText': arabic,
-                    'englishTranslation': english,
-                    'transliteration': translit
+                current_dua = Dua(id=f'common-act-{dua_counter}', name=name, description=desc)
+                current_lines = {
+                    'arabic_text': [arabic],
+                    'english_translation': [english],
+                    'transliteration': [translit],
                 }
-                current_dua = new_dua
+                # Footnotes of the preamble and of the dua itself
+                current_refs = preamble_refs + refs
                 current_preamble = [] # Consumed
+                preamble_refs = []
         else:
             # It is preamble/instruction
             if current_dua:
                 # Current Dua is finished.
                 # Deduplicate: Check if a dua with same Arabic/English exists
-                content_hash = current_dua['arabicText'] + current_dua['englishTranslation']
+                content_hash = content_digest(finish_dua(current_dua, current_lines))
                 if content_hash not in seen_contents:
-                    duas.append(current_dua)
+                    if footnotes is not None:
+                        current_dua.footnote_ids = footnotes.link(current_dua.id, current_refs)
+                    yield current_dua
                     seen_contents.add(content_hash)
                     dua_counter += 1
                 else:
-                    print(f"Skipping duplicate dua: {current_dua['name']}")
+                    print(f"Skipping duplicate dua: {current_dua.name}")
                 
                 current_dua = None
             
             # Add to preamble buffer
             if english:
                 current_preamble.append(english)
+            preamble_refs.extend(refs)
 
     # Add last dua
     if current_dua:
-        content_hash = current_dua['arabicText'] + current_dua['englishTranslation']
+        content_hash = content_digest(finish_dua(current_dua, current_lines))
         if content_hash not in seen_contents:
-            duas.append(current_dua)
+            if footnotes is not None:
+                current_dua.footnote_ids = footnotes.link(current_dua.id, current_refs)
+            yield current_dua
 
 
-    # Generate TS Content
-    ts_content = f"""// Auto-generated from common_acts_ramadan.json
+def render_typescript(duas):
+    """Render the segmented duas as the ramadan_extracted.ts module."""
+    parts = [f"""// Auto-generated from common_acts_ramadan.json
 export interface Dua {{
   id: string;
   name: string;
@@ -138,6 +153,7 @@ export interface Dua {{
   transliteration?: string;
   preamble?: string;
   postamble?: string;
+  footnoteIds?: string[];
 }}
 
 export interface Aamal {{
@@ -153,35 +169,171 @@ export interface Aamal {{
 }}
 
 export const duas: Dua[] = [
-"""
+"""]
     
     for d in duas:
         # Sanitize strings for JS template literals
-        desc = d['description'].replace('`', '\\`').replace('${', '\\${')
-        arab = d['arabicText'].replace('`', '\\`').replace('${', '\\${')
-        eng = d['englishTranslation'].replace('`', '\\`').replace('${', '\\${')
-        trans = d['transliteration'].replace('`', '\\`').replace('${', '\\${')
+        desc = d.description.replace('`', '\\`').replace('${', '\\${')
+        arab = d.arabic_text.replace('`', '\\`').replace('${', '\\${')
+        eng = d.english_translation.replace('`', '\\`').replace('${', '\\${')
+        trans = d.transliteration.replace('`', '\\`').replace('${', '\\${')
         
-        ts_content += f"""  {{
-    id: '{d['id']}',
-    name: `{d['name']}`,
-    arabicName: `{d['arabicName']}`,
+        footnotes = ''
+        if d.footnote_ids:
+            footnotes = f"    footnoteIds: {json.dumps(d.footnote_ids)},\n"
+
+        parts.append(f"""  {{
+    id: '{d.id}',
+    name: `{d.name}`,
+    arabicName: `{d.arabic_name}`,
     description: `{desc}`,
-    level: {d['level']},
-    source: '{d['source']}',
+    level: {d.level},
+    source: '{d.source}',
     applicableDays: 'all',
     arabicText: `{arab}`,
     englishTranslation: `{eng}`,
     transliteration: `{trans}`,
-  }},
-"""
+{footnotes}  }},
+""")
+
+    parts.append("];\n\nexport const aamal: Aamal[] = [];\n")
+    parts.append("""
+export interface FootnoteTable {
+  footnotes: Record<string, string>;
+  referencedBy: Record<string, string[]>;
+}
 
-    ts_content += "];\n\nexport const aamal: Aamal[] = [];\n"
+// Footnote texts are shared by id and only fetched when first shown
+export const loadFootnotes = (): Promise<FootnoteTable> =>
+  import('./footnotes.json').then((m) => m.default as FootnoteTable);
+""")
+    return "".join(parts)
+
+
+def generate_ramadan_data(profile=False, merge_policy=None):
+    with Instrumentation("generate_ramadan_data", profile) as instr:
+        _generate_ramadan_data(instr, merge_policy)
+
+
+def _generate_ramadan_data(instr, merge_policy):
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    input_file = os.path.join(project_root, 'common_acts_ramadan.json')
+    output_file = os.path.join(project_root, 'app', 'src', 'data', 'ramadan_extracted.ts')
+    footnotes_file = os.path.join(project_root, 'app', 'src', 'data', 'footnotes.json')
+    source_file = os.path.join(project_root, 'shahr_ramadan_translated.json')
+
+    print(f"Reading from {input_file}")
+    with instr.stage("load") as stage:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        items = data['content']['items']
+        stage.items = len(items)
+
+    # Labels are cached per item, so only edited items are reclassified
+    classifier = ItemClassifier(cache_path=CACHE_PATH)
+    # common_acts_ramadan.json only carries the refs; the texts are in the source
+    with instr.stage("footnotes") as stage:
+        table = FootnoteTable.from_source(source_file)
+        stage.items = len(table.footnotes)
+    with instr.stage("segment", len(items)):
+        duas = segment_common_acts(items, classifier, table)
+        classifier.save()
+    if merge_policy:
+        # Exact duplicates are already gone; optionally fold near-duplicates too
+        with instr.stage("merge_near_duplicates", len(duas)):
+            duas, merged = merge_near_duplicates(duas, merge_policy)
+            for dropped, kept in merged.items():
+                table.relink(dropped, kept)
+        for dropped, kept in merged.items():
+            print(f"Merged near-duplicate dua {dropped} into {kept}")
+    with instr.stage("render", len(duas)):
+        ts_content = render_typescript(duas)
 
     print(f"Writing to {output_file}")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(ts_content)
+    with instr.stage("write", len(duas)):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(ts_content)
     print(f"Generated {len(duas)} duas.")
 
+    with instr.stage("write_footnotes", len(table.referenced)):
+        table.write_json(footnotes_file)
+    print(f"Wrote {len(table.referenced)} footnotes to {footnotes_file}")
+    if table.unresolved:
+        print(f"Unresolved footnote refs: {', '.join(sorted(table.unresolved))}")
+
+def synthetic_items(items, n_items, dua_length=100):
+    """
+    A synthetic Common Acts list of ``n_items`` items built from the real
+    ones: each instruction item is followed by ``dua_length`` content
+    items, and every copy is numbered so no two duas are duplicates.
+    """
+    # Numbered items ("1. Sayyid Ibn Tawus narrated ...") always open a new dua
+    instructions = [item for item in items if re.match(r'^\d+\.', item.get('english', ''))]
+    contents = [item for item in items if segment_common_acts([item])]
+    synthetic = []
+    copy = 0
+    while len(synthetic) < n_items:
+        instruction = instructions[copy % len(instructions)]
+        synthetic.append({**instruction, 'id': len(synthetic), 'english': f"{instruction.get('english', '')} ({copy})"})
+        for i in range(dua_length):
+            content = contents[(copy + i) % len(contents)]
+            synthetic.append({
+                **content,
+                'id': len(synthetic),
+                'arabic': f"{content['arabic']} {copy}",
+                'english': f"{content.get('english', '')} {copy}",
+            })
+        copy += 1
+    return synthetic[:n_items]
+
+
+def benchmark(n_items):
+    """Time segmentation of synthetic Common Acts files of growing size."""
+    import tempfile
+    import time
+    import tracemalloc
+    from contextlib import redirect_stdout
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(project_root, 'common_acts_ramadan.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    print(f"{'items':>8} {'duas':>6} {'seconds':>8} {'items/s':>10} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (n_items // 8, n_items // 4, n_items // 2, n_items):
+            path = os.path.join(tmp, 'common_acts_ramadan.json')
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                items = synthetic_items(data['content']['items'], size)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({**data, 'content': {**data['content'], 'items': items}}, f, ensure_ascii=False)
+            with open(path, 'r', encoding='utf-8') as f:
+                items = json.load(f)['content']['items']
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                # Counted, not kept: the peak is the segmenter's own working set
+                duas = sum(1 for _ in iter_common_acts(items))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del items
+            print(f"{size:>8} {duas:>6} {elapsed:>8.3f} {size / elapsed:>10.0f} {peak / 2**20:>9.1f}")
+
+
 if __name__ == "__main__":
-    generate_ramadan_data()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate ramadan_extracted.ts from common_acts_ramadan.json")
+    parser.add_argument("--benchmark", type=int, metavar="N", nargs="?", const=100_000,
+                        help="Benchmark segmentation on synthetic files of up to N items (default 100000) instead")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run (cProfile, tracemalloc) and write a Chrome trace to tools/.cache/profile/")
+    parser.add_argument("--merge-near-duplicates", choices=sorted(MERGE_POLICIES), metavar="POLICY",
+                        help="Keep one dua per near-duplicate cluster: 'first' or 'longest' (default: keep all)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+    else:
+        generate_ramadan_data(profile=args.profile, merge_policy=args.merge_near_duplicates)
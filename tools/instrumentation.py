@@ -0,0 +1,166 @@
+"""
+Per-stage instrumentation shared by the generators.
+
+generate_data.py, generate_ramadan_data.py and ramadan_content_extractor.py
+wrap each of their stages (load, segment, render, write, ...) in
+``Instrumentation.stage``, which records the stage's wall time and the
+number of items it handled. Stages can nest.
+
+That bookkeeping is always on and costs a couple of clock reads per stage.
+With ``--profile`` the run is also profiled: cProfile covers the whole run,
+tracemalloc attributes allocations to each stage (net bytes and peak), and
+when the run finishes:
+
+    tools/.cache/profile/<name>.prof        cProfile stats (pstats, snakeviz)
+    tools/.cache/profile/<name>.trace.json  Chrome trace events (chrome://tracing, Perfetto)
+
+are written and a per-stage summary is printed. Without ``--profile``
+nothing is printed or written, so the generators' output is unchanged.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from build_cache import CACHE_DIR
+
+PROFILE_DIR = CACHE_DIR / "profile"
+
+
+class Stage:
+    """One timed stage. ``items`` can be set inside the ``with`` block once it is known."""
+
+    __slots__ = ("name", "depth", "start", "seconds", "items", "allocated", "peak")
+
+    def __init__(self, name: str, depth: int, items: int | None):
+        self.name = name
+        self.depth = depth
+        self.start = 0.0
+        self.seconds = 0.0
+        self.items = items
+        # Net bytes allocated and peak traced memory, only with profiling
+        self.allocated: int | None = None
+        self.peak: int | None = None
+
+
+class Instrumentation:
+    """
+    Stage timers for one generator run, optionally with cProfile and
+    tracemalloc. Use as a context manager around the run.
+    """
+
+    def __init__(self, name: str, profile: bool = False, output_dir: Path = PROFILE_DIR):
+        self.name = name
+        self.profile = profile
+        self.output_dir = Path(output_dir)
+        self.stages: list[Stage] = []
+        self.origin = time.perf_counter()
+        self.profiler: cProfile.Profile | None = None
+        # [stage, peak carried over from its finished sub-stages] for each open stage
+        self._open: list[list] = []
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> "Instrumentation":
+        self.origin = time.perf_counter()
+        if self.profile:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is None:
+            return
+        self.profiler.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        if exc_type is None:
+            self.write()
+            print(self.report())
+
+    @contextmanager
+    def stage(self, name: str, items: int | None = None) -> Iterator[Stage]:
+        stage = Stage(name, len(self._open), items)
+        self.stages.append(stage)
+        tracing = self.profile and tracemalloc.is_tracing()
+        if tracing:
+            before, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for each stage; carry the enclosing stage's peak so far
+            if self._open:
+                self._open[-1][1] = max(self._open[-1][1], peak)
+            tracemalloc.reset_peak()
+        self._open.append([stage, 0])
+        stage.start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - stage.start
+            _, carried = self._open.pop()
+            if tracing:
+                after, peak = tracemalloc.get_traced_memory()
+                stage.allocated = after - before
+                stage.peak = max(peak, carried)
+                if self._open:
+                    self._open[-1][1] = max(self._open[-1][1], stage.peak)
+
+    def trace_events(self) -> dict:
+        """The stages as Chrome trace-event JSON (complete events plus a memory counter)."""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": self.name}}]
+        for stage in self.stages:
+            ts = (stage.start - self.origin) * 1e6
+            args = {key: value for key, value in (
+                ("items", stage.items),
+                ("allocated", stage.allocated),
+                ("peak", stage.peak),
+            ) if value is not None}
+            events.append({
+                "name": stage.name, "cat": self.name, "ph": "X", "pid": pid, "tid": tid,
+                "ts": round(ts, 3), "dur": round(stage.seconds * 1e6, 3), "args": args,
+            })
+            if stage.peak is not None:
+                events.append({
+                    "name": "memory", "ph": "C", "pid": pid, "tid": tid,
+                    "ts": round(ts + stage.seconds * 1e6, 3), "args": {"peak": stage.peak},
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self) -> tuple[Path, Path]:
+        """Write the cProfile stats and the trace events; returns their paths."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        prof_path = self.output_dir / f"{self.name}.prof"
+        trace_path = self.output_dir / f"{self.name}.trace.json"
+        if self.profiler is not None:
+            self.profiler.dump_stats(prof_path)
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(self.trace_events(), f)
+        return prof_path, trace_path
+
+    def report(self, top: int = 10) -> str:
+        lines = [f"Profile of {self.name}:",
+                 f"  {'stage':<28} {'seconds':>9} {'items':>8} {'items/s':>10} {'alloc MiB':>10} {'peak MiB':>9}"]
+        for stage in self.stages:
+            name = "  " * stage.depth + stage.name
+            items = "" if stage.items is None else stage.items
+            rate = f"{stage.items / stage.seconds:.0f}" if stage.items and stage.seconds else ""
+            allocated = "" if stage.allocated is None else f"{stage.allocated / 2**20:.1f}"
+            peak = "" if stage.peak is None else f"{stage.peak / 2**20:.1f}"
+            lines.append(f"  {name:<28} {stage.seconds:>9.3f} {items:>8} {rate:>10} {allocated:>10} {peak:>9}")
+        if self.profiler is not None:
+            stats = pstats.Stats(self.profiler)
+            lines.append(f"  Top {top} functions by cumulative time:")
+            entries = sorted(stats.stats.items(), key=lambda entry: entry[1][3], reverse=True)[:top]
+            for (filename, lineno, function), (_, calls, _, cumulative, _) in entries:
+                lines.append(f"    {cumulative:>8.3f}s {calls:>8}  {Path(filename).name}:{lineno}({function})")
+        lines.append(f"  Wrote {self.output_dir / (self.name + '.prof')} and {self.name}.trace.json")
+        return "\n".join(lines)
@@ -0,0 +1,234 @@
+"""
+Split output for the generated dua/aamal data.
+
+Instead of one module holding every text, writes a small index module
+(enough to list and filter items) plus one JSON chunk per item that the
+app can load with a dynamic ``import()`` when the item is opened.
+
+With a page size, the phrases of an item too large for one page are moved
+out of its chunk into page files (``<chunk>.p<N>.json``) of at most about
+that many bytes each, so opening a long dua (Iftitah is ~45 KB) only
+fetches the first page. The chunk then carries ``phraseCount`` and a
+``phrasePages`` table of ``{first, count, bytes}`` per page: the phrase ->
+page offset table the app uses to find which page holds a phrase, and the
+estimated size of each page.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterator
+
+from ts_emitter import AtomicWriter, iter_json_array, write_chunks
+
+# Fields needed to list and filter items without loading their text
+INDEX_FIELDS = ("id", "name", "level", "applicableDays", "type")
+
+INDEX_HEADER = """// Auto-generated by tools/generate_data.py --split
+// DO NOT EDIT DIRECTLY
+
+import type { Dua, Aamal } from '../ramadan_extracted';
+
+export interface ItemSummary {
+  id: string;
+  name: string;
+  level: 1 | 2 | 3;
+  applicableDays: 'all' | number[];
+  type: 'dua' | 'aamal';
+}
+
+"""
+
+INDEX_FOOTER = """
+export async function loadItem(id: string): Promise<Dua | Aamal | undefined> {
+  const loader = itemLoaders[id];
+  if (!loader) return undefined;
+  const mod = await loader();
+  return mod.default as Dua | Aamal;
+}
+"""
+
+PAGED_FOOTER = """
+export interface PhrasePage {
+  first: number;
+  count: number;
+  bytes: number;
+}
+
+// Chunks of paged items have no phrases, only where to find them
+export interface PagedFields {
+  phraseCount?: number;
+  phrasePages?: PhrasePage[];
+}
+
+export async function loadPhrasePage(id: string, page: number): Promise<Phrase[]> {
+  const loader = pageLoaders[id]?.[page];
+  if (!loader) return [];
+  const mod = await loader();
+  return mod.default as Phrase[];
+}
+
+// Index of the page holding phrase ``index`` (binary search on ``first``)
+export function pageOfPhrase(pages: PhrasePage[], index: number): number {
+  let lo = 0;
+  let hi = pages.length - 1;
+  while (lo < hi) {
+    const mid = (lo + hi + 1) >> 1;
+    if (pages[mid].first <= index) lo = mid;
+    else hi = mid - 1;
+  }
+  return lo;
+}
+"""
+
+# Per-phrase JSON syntax around the strings: braces, quotes, colons, commas
+PHRASE_OVERHEAD = 2
+FIELD_OVERHEAD = 6
+
+
+def chunk_name(item_id: str, taken: set[str]) -> str:
+    """Return a filesystem/URL-safe, unique chunk file stem for an item id."""
+    base = re.sub(r"[^a-z0-9_-]+", "-", item_id.lower()).strip("-") or "item"
+    name = base
+    counter = 2
+    while name in taken:
+        name = f"{base}-{counter}"
+        counter += 1
+    taken.add(name)
+    return name
+
+
+# itemLoaders entries of a generated index.ts: "<id>": () => import('./<chunk>.json'),
+LOADER_RE = re.compile(r"""^  ("(?:[^"\\]|\\.)*"): \(\) => import\('\./([^']+)\.json'\),$""", re.MULTILINE)
+
+
+def previous_chunk_names(index_path: Path) -> dict[str, str]:
+    """The id -> chunk name map of an earlier run, read back from its index.ts."""
+    try:
+        text = Path(index_path).read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    return {json.loads(item_id): name for item_id, name in LOADER_RE.findall(text)}
+
+
+def item_summary(item: dict) -> dict:
+    return {field: item[field] for field in INDEX_FIELDS}
+
+
+def phrase_size(phrase: dict) -> int:
+    """Estimated serialised size of a phrase in bytes (its UTF-8 text plus JSON syntax)."""
+    size = PHRASE_OVERHEAD
+    for key, value in phrase.items():
+        if isinstance(value, str):
+            size += len(key) + len(value.encode("utf-8")) + FIELD_OVERHEAD
+    return size
+
+
+def paginate(phrases: list[dict], page_size: int) -> list[dict]:
+    """
+    Split ``phrases`` greedily into pages of at most ``page_size`` estimated
+    bytes (a single larger phrase gets a page of its own). Returns the
+    ``{first, count, bytes}`` table.
+    """
+    pages = []
+    first = size = 0
+    for i, phrase in enumerate(phrases):
+        phrase_bytes = phrase_size(phrase)
+        if i > first and size + phrase_bytes > page_size:
+            pages.append({"first": first, "count": i - first, "bytes": size})
+            first, size = i, 0
+        size += phrase_bytes
+    if len(phrases) > first:
+        pages.append({"first": first, "count": len(phrases) - first, "bytes": size})
+    return pages
+
+
+def iter_index_module(items: list[dict], chunk_names: dict[str, str],
+                      page_counts: dict[str, int] | None = None) -> Iterator[str]:
+    yield INDEX_HEADER if page_counts is None else INDEX_HEADER.replace(
+        "import type { Dua, Aamal }", "import type { Dua, Aamal, Phrase }")
+    yield "export const itemIndex: ItemSummary[] = "
+    yield from iter_json_array(item_summary(item) for item in items)
+    yield ";\n\n"
+    yield "const itemLoaders: Record<string, () => Promise<{ default: unknown }>> = {\n"
+    for item in items:
+        name = chunk_names[item["id"]]
+        yield f"  {json.dumps(item['id'], ensure_ascii=False)}: () => import('./{name}.json'),\n"
+    yield "};\n"
+    yield INDEX_FOOTER
+    if page_counts is None:
+        return
+    yield "\nconst pageLoaders: Record<string, Array<() => Promise<{ default: unknown }>>> = {\n"
+    for item in items:
+        pages = page_counts.get(item["id"])
+        if pages:
+            name = chunk_names[item["id"]]
+            loaders = ", ".join(f"() => import('./{name}.p{page}.json')" for page in range(pages))
+            yield f"  {json.dumps(item['id'], ensure_ascii=False)}: [{loaders}],\n"
+    yield "};\n"
+    yield PAGED_FOOTER
+
+
+def write_json(path: Path, data) -> bool:
+    writer = AtomicWriter(path)
+    with writer as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    return writer.changed
+
+
+def write_split_output(items: list[dict], out_dir: Path, changed_ids: set[str] | None = None,
+                       page_size: int | None = None) -> dict:
+    """
+    Write ``index.ts`` and one ``<chunk>.json`` per item into ``out_dir``,
+    and with ``page_size`` the phrase pages of items larger than a page.
+
+    Unchanged chunks are left untouched and chunks for items that no
+    longer exist are removed. With ``changed_ids`` (e.g. from watch mode),
+    only those items' chunks, chunks not yet on disk and chunks whose name
+    changed since the previous index.ts are serialised at all. Returns counts for reporting.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    taken: set[str] = set()
+    chunk_names = {item["id"]: chunk_name(item["id"], taken) for item in items}
+    # Names shift when an item with a colliding slug comes or goes, so a chunk
+    # file only still holds its item if the item had the same name last time
+    previous_names = previous_chunk_names(out_dir / "index.ts") if changed_ids is not None else {}
+
+    # Page tables are computed for every item (the index needs the page
+    # counts) but only written for changed ones
+    page_counts = None if page_size is None else {}
+    keep = set(taken)
+    written = 0
+    for item in items:
+        name = chunk_names[item["id"]]
+        chunk = item
+        pages = []
+        phrases = item.get("phrases") or []
+        if page_size is not None and sum(map(phrase_size, phrases)) > page_size:
+            pages = paginate(phrases, page_size)
+            page_counts[item["id"]] = len(pages)
+            keep.update(f"{name}.p{page}" for page in range(len(pages)))
+            chunk = {key: value for key, value in item.items() if key != "phrases"}
+            chunk["phraseCount"] = len(phrases)
+            chunk["phrasePages"] = pages
+
+        chunk_path = out_dir / f"{name}.json"
+        if (changed_ids is not None and item["id"] not in changed_ids and chunk_path.exists()
+                and previous_names.get(item["id"]) == name):
+            continue
+        written += write_json(chunk_path, chunk)
+        for page, entry in enumerate(pages):
+            written += write_json(out_dir / f"{name}.p{page}.json",
+                                  phrases[entry["first"]:entry["first"] + entry["count"]])
+
+    removed = 0
+    for stale in out_dir.glob("*.json"):
+        if stale.stem not in keep:
+            stale.unlink()
+            removed += 1
+
+    index_changed = write_chunks(out_dir / "index.ts", iter_index_module(items, chunk_names, page_counts))
+    return {"chunks": len(items), "pages": sum((page_counts or {}).values()), "written": written,
+            "removed": removed, "index_changed": index_changed}
@@ -0,0 +1,169 @@
+"""
+Rule-table classifier for Common Acts items.
+
+generate_ramadan_data.py splits the Common Acts section into duas by
+deciding, for every item, whether it is dua text ("content") or an
+instruction/preamble. The rules live in one ordered table here: the first
+rule that fires decides the label, and an item no rule fires on is
+content. Each rule counts its hits so the table can be profiled and
+reordered.
+
+With a cache file (tools/.cache/item_classes.json), labels are cached by
+item id together with a digest of the item's text, so reclassifying
+common_acts_ramadan.json after editing one item only evaluates the rules
+for that item. Without one nothing is kept per item.
+
+Usage:
+    python tools/item_classifier.py    # classify common_acts_ramadan.json and print rule hits
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Callable
+
+from build_cache import CACHE_DIR
+from keyword_matcher import KeywordMatcher
+from ts_emitter import AtomicWriter
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_PATH = CACHE_DIR / "item_classes.json"
+
+CONTENT = "content"
+INSTRUCTION = "instruction"
+
+# Bump when a rule changes so cached labels are discarded
+RULES_VERSION = "1"
+
+NUMBERED_RE = re.compile(r"^\d+\.")
+INSTRUCTION_KEYWORDS = KeywordMatcher([
+    "saying:", "say:", "recite:", "supplicate", "narrated", "said:",
+    "recommended to", "reported that", "peace be upon",
+], fold=str.lower)
+
+
+class Rule:
+    """A named test on an item's stripped text fields, with the label it assigns."""
+
+    def __init__(self, name: str, label: str, test: Callable[[str, str, str], bool]):
+        self.name = name
+        self.label = label
+        self.test = test
+
+
+# Evaluated in order on (arabic, english, transliteration); the first hit wins
+RULES = [
+    Rule("no_arabic", INSTRUCTION, lambda arabic, english, translit: not arabic),
+    # "1. Sayyid Ibn Tawus narrated ..." opens a new practice
+    Rule("numbered", INSTRUCTION, lambda arabic, english, translit: bool(NUMBERED_RE.match(english))),
+    # A short phrase without transliteration is a header; duas in this file are transliterated
+    Rule("short_untransliterated", INSTRUCTION, lambda arabic, english, translit: not translit and len(arabic) < 50),
+    Rule("instruction_keyword", INSTRUCTION, lambda arabic, english, translit: INSTRUCTION_KEYWORDS.matches(english)),
+]
+
+
+def text_fields(item: dict) -> tuple[str, str, str]:
+    return (
+        item.get("arabic", "").strip(),
+        item.get("english", "").strip(),
+        item.get("transliteration", "").strip(),
+    )
+
+
+def text_digest(fields: tuple[str, str, str]) -> str:
+    return hashlib.blake2b("\0".join(fields).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ItemClassifier:
+    """Classify items as content or instruction, with per-rule hit counts and a label cache."""
+
+    def __init__(self, rules: list[Rule] = RULES, cache_path: Path | None = None):
+        self.rules = rules
+        self.cache_path = Path(cache_path) if cache_path else None
+        # item id -> [text digest, label]
+        self.cache: dict[str, list[str]] = {}
+        self.hits = {rule.name: 0 for rule in rules}
+        self.hits["default"] = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.dirty = False
+        if self.cache_path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == RULES_VERSION:
+            self.cache = data.get("items", {})
+
+    def save(self):
+        """Write the label cache back to disk if anything changed."""
+        if not self.cache_path or not self.dirty:
+            return
+        with AtomicWriter(self.cache_path) as f:
+            json.dump({"version": RULES_VERSION, "items": self.cache}, f)
+        self.dirty = False
+
+    def evaluate(self, fields: tuple[str, str, str]) -> str:
+        """Run the rule table on an item's text, bypassing the cache."""
+        for rule in self.rules:
+            if rule.test(*fields):
+                self.hits[rule.name] += 1
+                return rule.label
+        self.hits["default"] += 1
+        return CONTENT
+
+    def classify(self, item: dict) -> str:
+        fields = text_fields(item)
+        if item.get("id") is None:
+            return self.evaluate(fields)
+
+        # Without a cache file the labels would never be reused: skip the digest and the entry
+        if not self.cache_path:
+            return self.evaluate(fields)
+
+        key = str(item["id"])
+        digest = text_digest(fields)
+        cached = self.cache.get(key)
+        if cached and cached[0] == digest:
+            self.cache_hits += 1
+            return cached[1]
+
+        self.cache_misses += 1
+        label = self.evaluate(fields)
+        self.cache[key] = [digest, label]
+        self.dirty = True
+        return label
+
+    def report(self) -> str:
+        lines = [f"Cache: {self.cache_hits} hit(s), {self.cache_misses} miss(es)"]
+        for name, count in self.hits.items():
+            lines.append(f"  {name:<24} {count}")
+        return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classify Common Acts items and report rule hits")
+    parser.add_argument("input", nargs="?", type=Path, default=PROJECT_ROOT / "common_acts_ramadan.json")
+    parser.add_argument("--no-cache", action="store_true", help="Evaluate every item without the label cache")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        items = json.load(f)["content"]["items"]
+
+    classifier = ItemClassifier(cache_path=None if args.no_cache else CACHE_PATH)
+    labels = [classifier.classify(item) for item in items]
+    classifier.save()
+
+    print(f"{labels.count(CONTENT)} content, {labels.count(INSTRUCTION)} instruction item(s)")
+    print(classifier.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Incremental, event-based JSON reader (in the style of ijson).
+
+The extraction scripts only need one section out of a large source file.
+Instead of ``json.load``-ing the whole book, these helpers read the file in
+fixed-size chunks, emit parse events and only materialise the objects at a
+requested prefix, stopping as soon as the wanted section has been found.
+Memory is then bounded by the size of the section, not the file.
+
+Prefixes follow ijson's convention: object keys are joined with ``.`` and
+array elements are written as ``item``, e.g. ``content.items.item`` is
+every element of ``data["content"]["items"]``.
+
+:func:`load_path` instead follows a JSON-pointer style path of object keys
+and array indices, skipping the siblings on the way without building them.
+
+If the ``ijson`` package is installed its C backend is used for parsing;
+otherwise the pure-Python tokenizer below is used. Both produce the same
+events. Open files in binary mode: ijson reads bytes, and the pure-Python
+tokenizer decodes UTF-8 itself (it also accepts text streams).
+"""
+
+import io
+import json
+import re
+from typing import IO, Any, Callable, Iterator
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+BUF_SIZE = 1 << 16
+
+WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+# Characters a number can be made of; NUMBER_RE may stop short of them at a buffer boundary
+NUMBER_CHARS_RE = re.compile(r"[-+.eE0-9]*")
+LITERALS = {"true": True, "false": False, "null": None}
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+def _tokens(fp: IO[str], buf_size: int = BUF_SIZE) -> Iterator[tuple[str, Any]]:
+    """Yield ``(kind, value)`` lexical tokens from a text stream."""
+    buf = ""
+    pos = 0
+    eof = False
+
+    def refill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(buf_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        pos = WHITESPACE_RE.match(buf, pos).end()
+        if pos >= len(buf):
+            if eof:
+                return
+            refill()
+            continue
+
+        ch = buf[pos]
+        if ch in "{}[]:,":
+            yield ch, None
+            pos += 1
+        elif ch == '"':
+            try:
+                value, end = json.decoder.scanstring(buf, pos + 1)
+            except json.JSONDecodeError:
+                if eof:
+                    raise JSONStreamError(f"Unterminated string near: {buf[pos:pos + 40]!r}")
+                refill()
+                continue
+            yield "string", value
+            pos = end
+        else:
+            match = NUMBER_RE.match(buf, pos)
+            # A token touching the end of the buffer may continue in the next chunk. A
+            # number cut after "." or "e" matches only its prefix, so look at the whole run
+            if (match and NUMBER_CHARS_RE.match(buf, pos).end() == len(buf) or len(buf) - pos < 5) and not eof:
+                refill()
+                continue
+            if match:
+                text = match.group()
+                yield "number", float(text) if any(c in text for c in ".eE") else int(text)
+                pos = match.end()
+                continue
+            for literal, value in LITERALS.items():
+                if buf.startswith(literal, pos):
+                    yield "literal", value
+                    pos += len(literal)
+                    break
+            else:
+                raise JSONStreamError(f"Unexpected character {ch!r} near: {buf[pos:pos + 40]!r}")
+
+
+def _scalar_event(kind: str, value: Any) -> str:
+    if kind == "string":
+        return "string"
+    if kind == "number":
+        return "number"
+    return "null" if value is None else "boolean"
+
+
+def parse(fp: IO, buf_size: int = BUF_SIZE) -> Iterator[tuple[str, str, Any]]:
+    """Yield ``(prefix, event, value)`` tuples for a JSON document."""
+    if ijson is not None:
+        yield from ijson.parse(fp, use_float=True)
+        return
+    if isinstance(fp.read(0), bytes):
+        text = io.TextIOWrapper(fp, encoding="utf-8")
+        try:
+            yield from _pure_parse(text, buf_size)
+        finally:
+            # Leave the caller's file open
+            text.detach()
+        return
+    yield from _pure_parse(fp, buf_size)
+
+
+def _pure_parse(fp: IO, buf_size: int = BUF_SIZE) -> Iterator[tuple[str, str, Any]]:
+    # Each frame is [container kind, its own prefix, expecting a key?]
+    stack: list[list] = []
+    prefix = ""
+
+    for kind, value in _tokens(fp, buf_size):
+        if kind == ",":
+            if stack[-1][0] == "map":
+                stack[-1][2] = True
+            continue
+        if kind == ":":
+            continue
+
+        if stack and stack[-1][2] and kind == "string":
+            own_prefix = stack[-1][1]
+            yield own_prefix, "map_key", value
+            prefix = f"{own_prefix}.{value}" if own_prefix else value
+            stack[-1][2] = False
+            continue
+
+        if stack and stack[-1][0] == "array":
+            prefix = f"{stack[-1][1]}.item" if stack[-1][1] else "item"
+
+        if kind == "{":
+            yield prefix, "start_map", None
+            stack.append(["map", prefix, True])
+        elif kind == "[":
+            yield prefix, "start_array", None
+            stack.append(["array", prefix, False])
+        elif kind in "}]":
+            frame = stack.pop()
+            yield frame[1], "end_map" if kind == "}" else "end_array", None
+        else:
+            yield prefix, _scalar_event(kind, value), value
+
+
+def _build(events: Iterator[tuple[str, str, Any]], first_event: str, first_value: Any) -> Any:
+    """Materialise the value whose first event was just read from ``events``."""
+    if first_event == "start_map":
+        obj = {}
+        for _, event, value in events:
+            if event == "end_map":
+                return obj
+            # event is map_key
+            _, next_event, next_value = next(events)
+            obj[value] = _build(events, next_event, next_value)
+    if first_event == "start_array":
+        arr = []
+        for _, event, value in events:
+            if event == "end_array":
+                return arr
+            arr.append(_build(events, event, value))
+    return first_value
+
+
+def _skip(events: Iterator[tuple[str, str, Any]], first_event: str):
+    """Consume the rest of the value whose first event was just read, without building it."""
+    if first_event not in ("start_map", "start_array"):
+        return
+    depth = 1
+    for _, event, _ in events:
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                return
+
+
+def _child(events: Iterator[tuple[str, str, Any]], event: str, token: str) -> tuple[str, Any] | None:
+    """
+    Read up to child ``token`` of the container that starts with ``event``
+    and return the child's first ``(event, value)``, or None if it has no
+    such child. Earlier children are skipped.
+    """
+    if event == "start_map":
+        for _, key_event, key in events:
+            if key_event == "end_map":
+                return None
+            _, first_event, first_value = next(events)
+            if key == token:
+                return first_event, first_value
+            _skip(events, first_event)
+    elif event == "start_array" and token.isdigit():
+        index = int(token)
+        for i, (_, first_event, first_value) in enumerate(events):
+            if first_event == "end_array":
+                return None
+            if i == index:
+                return first_event, first_value
+            _skip(events, first_event)
+    return None
+
+
+def load_path(fp: IO, path: list[str], buf_size: int = BUF_SIZE) -> Any:
+    """
+    Return the value at ``path`` (object keys and array indices as strings,
+    like the tokens of a JSON pointer), building only that value and
+    stopping there. Returns None if the path does not exist.
+    """
+    events = parse(fp, buf_size)
+    first = next(events, None)
+    if first is None:
+        return None
+    _, event, value = first
+    for token in path:
+        child = _child(events, event, token)
+        if child is None:
+            return None
+        event, value = child
+    return _build(events, event, value)
+
+
+def iter_items(fp: IO, prefix: str, buf_size: int = BUF_SIZE) -> Iterator[Any]:
+    """Yield each value found at ``prefix``, building only those values."""
+    events = parse(fp, buf_size)
+    for current, event, value in events:
+        if current == prefix and event not in ("map_key", "end_map", "end_array"):
+            yield _build(events, event, value)
+
+
+def find_first(fp: IO, prefix: str, predicate: Callable[[Any], Any], buf_size: int = BUF_SIZE) -> Any:
+    """
+    Return the first value at ``prefix`` for which ``predicate`` is truthy
+    (or the predicate's own non-boolean result), and stop reading the file
+    there. Returns None if nothing matches.
+    """
+    for value in iter_items(fp, prefix, buf_size):
+        result = predicate(value)
+        if result is True:
+            return value
+        if result:
+            return result
+    return None
+
+
+def boundary_cases(buf_size: int = BUF_SIZE) -> Iterator[str]:
+    """Documents that place numbers and literals across the ``buf_size`` boundary."""
+    for number in ("12.5e3", "-0.25E-7", "1e+10", "123456", "-7.0", "0"):
+        for offset in range(-12, 4):
+            padding = "a" * (buf_size - 18 + offset)
+            yield f'{{"root":["{padding}", {number}, true, null, false]}}'
+
+
+def check(documents: Iterator[tuple[str, str]], buf_sizes=(BUF_SIZE, 7)) -> list[str]:
+    """Names of the ``(name, text)`` documents the pure-Python tokenizer reads differently from json.loads."""
+    failures = []
+    for name, text in documents:
+        expected = json.loads(text)
+        for buf_size in buf_sizes:
+            events = (event for event in _pure_parse(io.StringIO(text), buf_size))
+            try:
+                _, first_event, first_value = next(events)
+                result = _build(events, first_event, first_value)
+            except JSONStreamError as e:
+                result = e
+            if result != expected:
+                failures.append(f"{name} (buf_size={buf_size}): {str(result)[:80]}")
+    return failures
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check the pure-Python JSON tokenizer against json.loads")
+    parser.add_argument("files", nargs="*", help="JSON files to check as well as the built-in boundary cases")
+    args = parser.parse_args()
+
+    documents = [(f"boundary case {i}", text) for i, text in enumerate(boundary_cases())]
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            documents.append((path, f.read()))
+    failures = check(documents)
+    for failure in failures:
+        print(f"Mismatch: {failure}")
+    print(f"{len(documents) - len({f.split(' (')[0] for f in failures})}/{len(documents)} document(s) match json.loads")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
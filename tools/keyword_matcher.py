@@ -0,0 +1,157 @@
+"""
+Multi-keyword matching in a single scan.
+
+The extractors used to test each keyword separately (``any(k in text for k
+in keywords)``), rescanning the text once per keyword. A KeywordMatcher
+compiles all of its keywords into one regular expression built from a
+prefix trie, so keywords sharing a prefix share the work and each string is
+scanned once however many keywords there are. At each position the longest
+keyword wins.
+
+Text and keywords are folded with the search index's ``normalise`` (tashkeel,
+alef/ya/ta-marbuta variants, Latin accents and case) and runs of whitespace
+are collapsed, so keywords match regardless of diacritics or spacing. A
+cheaper fold (e.g. ``str.lower``) can be passed for long, plain-English
+text where the Unicode folding would dominate the cost.
+
+The module also provides the Arabic ordinal day names (1-30, masculine and
+feminine, nominative and genitive) and the event verbs used for the Ramadan
+calendar.
+"""
+
+import re
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+from search_index import normalise
+
+
+def fold(text: str) -> str:
+    """Fold ``text`` the same way keywords are folded."""
+    return " ".join(normalise(text).split())
+
+
+def _trie_pattern(node: dict) -> str:
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # A keyword ends here: try the longer continuations first
+    return f"(?:{pattern})?" if "" in node else pattern
+
+
+class KeywordMatcher:
+    """Find any of a set of keywords (each mapped to a value) in one pass."""
+
+    def __init__(self, keywords: Mapping[str, Any] | Iterable[str], whole_words: bool = False,
+                 fold: Callable[[str], str] = fold):
+        if not isinstance(keywords, Mapping):
+            keywords = {keyword: keyword for keyword in keywords}
+        self.fold = fold
+        self.keywords: dict[str, Any] = {}
+        trie: dict = {}
+        for keyword, value in keywords.items():
+            key = fold(keyword)
+            self.keywords[key] = value
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        self.pattern = _trie_pattern(trie)
+        if whole_words:
+            self.regex = re.compile(rf"(?<!\w)({self.pattern})(?!\w)")
+        else:
+            self.regex = re.compile(f"({self.pattern})")
+
+    def finditer(self, text: str) -> Iterator[tuple[str, Any]]:
+        """Yield ``(keyword, value)`` for each non-overlapping match, left to right."""
+        for match in self.regex.finditer(self.fold(text)):
+            yield match.group(1), self.keywords[match.group(1)]
+
+    def search(self, text: str, default: Any = None) -> Any:
+        """Value of the first keyword found in ``text``."""
+        match = self.regex.search(self.fold(text))
+        return self.keywords[match.group(1)] if match else default
+
+    def values(self, text: str) -> list:
+        """Distinct values of every keyword found in ``text``, in order of first occurrence."""
+        found = []
+        for _, value in self.finditer(text):
+            if value not in found:
+                found.append(value)
+        return found
+
+    def matches(self, text: str) -> bool:
+        return self.regex.search(self.fold(text)) is not None
+
+
+# -- Arabic ordinal day names -------------------------------------------------
+
+_UNITS = [
+    # (day, masculine, feminine); 1 uses الحادي/الحادية in compounds
+    (1, "الأول", "الأولى"),
+    (2, "الثاني", "الثانية"),
+    (3, "الثالث", "الثالثة"),
+    (4, "الرابع", "الرابعة"),
+    (5, "الخامس", "الخامسة"),
+    (6, "السادس", "السادسة"),
+    (7, "السابع", "السابعة"),
+    (8, "الثامن", "الثامنة"),
+    (9, "التاسع", "التاسعة"),
+]
+
+
+def _arabic_ordinals() -> dict[str, int]:
+    ordinals = {"العاشر": 10, "العاشرة": 10}
+    for tens, names in ((20, ("العشرون", "العشرين")), (30, ("الثلاثون", "الثلاثين"))):
+        for name in names:
+            ordinals[name] = tens
+
+    for day, masculine, feminine in _UNITS:
+        ordinals[masculine] = day
+        ordinals[feminine] = day
+        compound_masculine = "الحادي" if day == 1 else masculine
+        compound_feminine = "الحادية" if day == 1 else feminine
+        # 11-19: الحادي عشر / الحادية عشرة (عشر is common in both)
+        ordinals[f"{compound_masculine} عشر"] = day + 10
+        ordinals[f"{compound_feminine} عشر"] = day + 10
+        ordinals[f"{compound_feminine} عشرة"] = day + 10
+        # 21-29: الحادي والعشرون / الحادية والعشرين ...
+        for compound in (compound_masculine, compound_feminine):
+            for tens in ("العشرون", "العشرين"):
+                ordinals[f"{compound} و{tens}"] = day + 20
+                ordinals[f"{compound} و {tens}"] = day + 20
+    return ordinals
+
+
+ARABIC_ORDINALS = KeywordMatcher(_arabic_ordinals(), whole_words=True)
+
+# "العاشر من رمضان:", "ليلة الثالث والعشرين من شهر رمضان", "السابع عشر:"
+DAY_HEADER_RE = re.compile(
+    rf"(?:ال)?(?:ليله|يوم)? ?({ARABIC_ORDINALS.pattern})"
+    r"(?: من (?:شهر )?رمضان(?: المبارك)?)? ?[:.]?"
+)
+
+
+def day_from_header(text: str) -> int | None:
+    """
+    Day of the month if ``text`` is a calendar date header (an ordinal day,
+    optionally "of Ramadan", and nothing else), otherwise None.
+    """
+    match = DAY_HEADER_RE.fullmatch(fold(text))
+    return ARABIC_ORDINALS.keywords[match.group(1)] if match else None
+
+
+def days_in_text(text: str) -> list[int]:
+    """Every day number named by an Arabic ordinal in ``text``."""
+    return ARABIC_ORDINALS.values(text)
+
+
+# Verbs that open a calendar event description, mapped to the kind of event
+EVENT_VERBS = KeywordMatcher({
+    "وفاة": "death",
+    "ولادة": "birth",
+    "شهادة": "martyrdom",
+    "جرح": "wounding",
+    "انتصار": "victory",
+})
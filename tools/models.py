@@ -0,0 +1,228 @@
+"""
+Typed in-memory model shared by the Python tooling.
+
+The generators each used to build ad-hoc dicts for the same app types
+(generate_data.py from DuaAmaal files, ramadan_content_extractor.py from
+Mafatih sections, generate_ramadan_data.py from Common Acts), and each
+normalised levels, preambles and content types in its own way. These
+classes are the single definition: attributes are snake_case, ``to_dict``
+produces the camelCase shape of the TypeScript interfaces, and
+:func:`load_item` is the one loader for DuaAmaal documents.
+
+All classes use ``__slots__``, so an item carries no per-instance dict,
+and values that repeat across the corpus (source names, "all", ids used as
+footnote keys) are interned so every item shares one copy.
+"""
+
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar
+
+DEFAULT_SOURCE = "Mafatih al-Jinan"
+
+DUA_TYPES = {"dua", "ziyarat", "supplication"}
+AAMAL_TYPES = {"aamal", "a'amal", "act"}
+
+
+def intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def parse_level(raw: Any) -> int:
+    """Level 1-3 from ``"L1"``-style strings, plain numbers or numeric strings; 1 otherwise."""
+    if isinstance(raw, bool):
+        return 1
+    if isinstance(raw, int):
+        return raw
+    if isinstance(raw, str):
+        try:
+            return int(raw.upper().replace("L", ""))
+        except ValueError:
+            return 1
+    return 1
+
+
+def parse_preamble(raw: Any) -> str:
+    """A preamble is either plain text or an object with an ``english`` field."""
+    if isinstance(raw, dict):
+        return raw.get("english", "")
+    return str(raw)
+
+
+def item_type(content_type: str) -> str:
+    """Map a source ``content_type`` to the app's item type (``dua`` or ``aamal``)."""
+    return "aamal" if content_type.lower() in AAMAL_TYPES else "dua"
+
+
+@dataclass(slots=True)
+class Phrase:
+    arabic: str
+    english: str
+    transliteration: str | None = None
+    # Any other keys of the source phrase, passed through unchanged
+    extra: dict[str, Any] | None = None
+
+    FIELDS: ClassVar[tuple[str, ...]] = ("arabic", "english", "transliteration")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Phrase":
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return cls(data.get("arabic", ""), data.get("english", ""), data.get("transliteration"), extra or None)
+
+    def to_dict(self) -> dict:
+        data = {"arabic": self.arabic, "english": self.english}
+        if self.transliteration is not None:
+            data["transliteration"] = self.transliteration
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+@dataclass(slots=True)
+class Item:
+    """Fields shared by duas and aamal. Optional fields left as None are omitted from ``to_dict``."""
+
+    type: ClassVar[str] = ""
+
+    id: str
+    name: str
+    arabic_name: str = ""
+    description: str = ""
+    level: int = 1
+    source: str = DEFAULT_SOURCE
+    applicable_days: str | list[int] = "all"
+    phrases: list[Phrase] | None = None
+    preamble: str | None = None
+    postamble: str | None = None
+    timing: str | None = None
+    arabic_text: str | None = None
+    english_translation: str | None = None
+    transliteration: str | None = None
+    footnote_ids: list[str] | None = None
+
+    def __post_init__(self):
+        self.id = intern(self.id)
+        self.source = intern(self.source)
+        self.applicable_days = intern(self.applicable_days)
+
+    def to_dict(self) -> dict:
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "arabicName": self.arabic_name,
+            "description": self.description,
+            "level": self.level,
+            "source": self.source,
+            "applicableDays": self.applicable_days,
+        }
+        if self.phrases is not None:
+            data["phrases"] = [phrase.to_dict() for phrase in self.phrases]
+        data["type"] = self.type
+        for key, value in (
+            ("preamble", self.preamble),
+            ("instructions", getattr(self, "instructions", None)),
+            ("timing", self.timing),
+            ("arabicText", self.arabic_text),
+            ("englishTranslation", self.english_translation),
+            ("transliteration", self.transliteration),
+            ("postamble", self.postamble),
+            ("footnoteIds", self.footnote_ids),
+        ):
+            if value is not None:
+                data[key] = value
+        return data
+
+
+@dataclass(slots=True)
+class Dua(Item):
+    type: ClassVar[str] = "dua"
+
+
+@dataclass(slots=True)
+class Aamal(Item):
+    type: ClassVar[str] = "aamal"
+
+    instructions: list[str] | None = None
+
+
+def item_from_source(data: dict, fallback_id: str) -> Dua | Aamal:
+    """Normalise a raw DuaAmaal document into a Dua or Aamal."""
+    preamble = parse_preamble(data.get("preamble", ""))
+    fields = dict(
+        id=data.get("id", fallback_id),
+        name=data.get("title", "Unknown Title"),
+        arabic_name=data.get("arabic_title", ""),
+        # Fall back to the preamble when there is no description
+        description=data.get("description", "") or preamble,
+        level=parse_level(data.get("level", 1)),
+        source=data.get("source", DEFAULT_SOURCE),
+        applicable_days=data.get("applicable_days", "all"),
+        phrases=[Phrase.from_dict(phrase) for phrase in data.get("phrases", [])],
+        preamble=preamble,
+    )
+    if item_type(data.get("content_type", "dua")) == "aamal":
+        return Aamal(**fields, instructions=data.get("instructions", []))
+    return Dua(**fields)
+
+
+def load_item(json_file: Path) -> Dua | Aamal:
+    """Load and normalise one DuaAmaal/*.json file."""
+    with open(json_file, "r", encoding="utf-8") as f:
+        return item_from_source(json.load(f), Path(json_file).stem)
+
+
+@dataclass(slots=True)
+class CalendarEvent:
+    """An entry of the app's ``calendarEvents`` (app/src/data/calendar_events.json)."""
+
+    date: int
+    title: str
+    description: str
+    type: str
+    level: int = 1
+    arabic_title: str | None = None
+    # Stable identity used to update or delete the event; see calendar_events.py
+    id: str | None = None
+
+    def __post_init__(self):
+        self.type = intern(self.type)
+
+    # Keys from_dict cannot do without
+    REQUIRED_FIELDS = ("date", "title", "type")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CalendarEvent":
+        missing = [key for key in cls.REQUIRED_FIELDS if key not in data]
+        if missing:
+            raise ValueError(f"Calendar event is missing required field(s) {', '.join(map(repr, missing))}")
+        return cls(
+            date=data["date"],
+            title=data["title"],
+            description=data.get("description", ""),
+            type=data["type"],
+            level=parse_level(data.get("level", 1)),
+            arabic_title=data.get("arabicTitle"),
+            id=data.get("id"),
+        )
+
+    def to_dict(self) -> dict:
+        data = {} if self.id is None else {"id": self.id}
+        data.update(date=self.date, title=self.title)
+        if self.arabic_title is not None:
+            data["arabicTitle"] = self.arabic_title
+        data.update(description=self.description, type=self.type, level=self.level)
+        return data
+
+
+@dataclass(slots=True)
+class Footnote:
+    """A footnote of the translated source and the generated items that reference it."""
+
+    id: str
+    text: str
+    referenced_by: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.id = intern(self.id)
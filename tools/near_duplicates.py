@@ -0,0 +1,270 @@
+"""
+Near-duplicate detection for duas across the corpus.
+
+segment_common_acts() drops duas whose text is byte-for-byte identical, but
+the same dua also turns up with small differences: a line more or less, a
+variant spelling, different diacritics. This module finds those with
+MinHash signatures and locality-sensitive hashing:
+
+  - each text is normalised (search_index.tokenize) and cut into
+    overlapping word shingles;
+  - a MinHash signature of ``num_perm`` values estimates the Jaccard
+    similarity of two shingle sets;
+  - signatures are split into bands and hashed into buckets, so only
+    documents sharing a bucket are compared, never all pairs;
+  - candidate pairs are confirmed with the exact Jaccard similarity of
+    their shingles.
+
+Pairs above the threshold are grouped into clusters, which can be reported
+or merged with one of ``MERGE_POLICIES`` (generate_ramadan_data.py
+--merge-near-duplicates).
+
+Usage:
+    python tools/near_duplicates.py                  # report on DuaAmaal and Common Acts duas
+    python tools/near_duplicates.py --threshold 0.6 --json report.json
+"""
+
+import hashlib
+import random
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Iterable
+
+from search_index import tokenize
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Mersenne prime 2**61 - 1 for the (a * x + b) mod p permutations
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[int]:
+    """32-bit hashes of the overlapping ``size``-word shingles of ``text``."""
+    words = tokenize(text)
+    if len(words) <= size:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return {int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in grams}
+
+
+def lsh_params(num_perm: int, threshold: float) -> tuple[int, int]:
+    """
+    (bands, rows) with ``bands * rows == num_perm`` whose S-curve threshold
+    (1/bands) ** (1/rows) is the highest one not above ``threshold``, so
+    pairs at the threshold are very likely to become candidates.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of documents; ``clusters()`` groups the near-duplicates."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE,
+                 seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+        self.ids: list[str] = []
+        # Documents without any text: every one would get the same signature
+        # and a Jaccard similarity of 1.0 with all the others, so they are
+        # kept out of the buckets and never reported as near-duplicates
+        self.empty: list[str] = []
+        self.shingles: dict[str, set[int]] = {}
+        self.signatures: dict[str, list[int]] = {}
+        self.buckets: list[dict[tuple, list[str]]] = [defaultdict(list) for _ in range(self.bands)]
+
+    def signature(self, hashes: set[int]) -> list[int]:
+        if not hashes:
+            return [MAX_HASH] * self.num_perm
+        return [min((a * h + b) % MERSENNE_PRIME for h in hashes) & MAX_HASH for a, b in self.permutations]
+
+    def add(self, doc_id: str, text: str):
+        if doc_id in self.shingles or doc_id in self.empty:
+            raise ValueError(f"Duplicate document id {doc_id!r}")
+        hashes = shingles(text, self.shingle_size)
+        if not hashes:
+            self.empty.append(doc_id)
+            return
+        signature = self.signature(hashes)
+        self.ids.append(doc_id)
+        self.shingles[doc_id] = hashes
+        self.signatures[doc_id] = signature
+        for band, buckets in enumerate(self.buckets):
+            buckets[tuple(signature[band * self.rows:(band + 1) * self.rows])].append(doc_id)
+
+    def estimate(self, a: str, b: str) -> float:
+        """Jaccard similarity estimated from the signatures."""
+        sig_a, sig_b = self.signatures[a], self.signatures[b]
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / self.num_perm
+
+    def candidates(self) -> set[tuple[str, str]]:
+        """Pairs sharing at least one band bucket, ordered as they were added."""
+        order = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        pairs = set()
+        for buckets in self.buckets:
+            for members in buckets.values():
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        pairs.add((a, b) if order[a] < order[b] else (b, a))
+        return pairs
+
+    def pairs(self) -> list[tuple[str, str, float]]:
+        """Confirmed near-duplicate pairs with their exact Jaccard similarity, most similar first."""
+        found = []
+        for a, b in self.candidates():
+            similarity = jaccard(self.shingles[a], self.shingles[b])
+            if similarity >= self.threshold:
+                found.append((a, b, similarity))
+        order = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        return sorted(found, key=lambda pair: (-pair[2], order[pair[0]], order[pair[1]]))
+
+    def clusters(self) -> list[list[str]]:
+        """Connected groups of near-duplicates (two or more ids each), members in insertion order."""
+        parent = {doc_id: doc_id for doc_id in self.ids}
+
+        def find(doc_id):
+            while parent[doc_id] != doc_id:
+                parent[doc_id] = parent[parent[doc_id]]
+                doc_id = parent[doc_id]
+            return doc_id
+
+        for a, b, _ in self.pairs():
+            parent[find(b)] = find(a)
+        groups = defaultdict(list)
+        for doc_id in self.ids:
+            groups[find(doc_id)].append(doc_id)
+        return [members for members in groups.values() if len(members) > 1]
+
+
+# -- Merging -------------------------------------------------------------------
+
+def item_text(item) -> str:
+    """Arabic text of a Dua/Aamal: its text block, or its phrases joined."""
+    if item.arabic_text:
+        return item.arabic_text
+    return "\n".join(phrase.arabic for phrase in item.phrases or [])
+
+
+MERGE_POLICIES: dict[str, Callable[[list], object]] = {
+    # The first occurrence in reading order
+    "first": lambda items: items[0],
+    # The most complete variant
+    "longest": lambda items: max(items, key=lambda item: len(item_text(item))),
+}
+
+
+def build_index(items: Iterable, threshold: float = 0.8) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(threshold)
+    for item in items:
+        index.add(item.id, item_text(item))
+    return index
+
+
+def find_clusters(items: list, threshold: float = 0.8) -> list[list]:
+    """Clusters of near-duplicate Dua/Aamal items, in reading order."""
+    by_id = {item.id: item for item in items}
+    return [[by_id[doc_id] for doc_id in cluster] for cluster in build_index(items, threshold).clusters()]
+
+
+def merge_near_duplicates(items: list, policy: str = "first", threshold: float = 0.8) -> tuple[list, dict[str, str]]:
+    """
+    Keep one item per near-duplicate cluster, chosen by ``policy``; the
+    kept item inherits the footnote ids of the ones dropped. Returns the
+    remaining items (in their original order) and ``{dropped id: kept id}``.
+    """
+    choose = MERGE_POLICIES[policy]
+    merged = {}
+    for cluster in find_clusters(items, threshold):
+        kept = choose(cluster)
+        footnote_ids = list(kept.footnote_ids or [])
+        for item in cluster:
+            if item is kept:
+                continue
+            merged[item.id] = kept.id
+            footnote_ids.extend(ref for ref in item.footnote_ids or [] if ref not in footnote_ids)
+        if footnote_ids:
+            kept.footnote_ids = footnote_ids
+    return [item for item in items if item.id not in merged], merged
+
+
+def report(clusters: list[list], similarity: Callable[[str, str], float]) -> str:
+    lines = [f"{len(clusters)} near-duplicate cluster(s)"]
+    for cluster in clusters:
+        first = cluster[0]
+        lines.append(f"  {first.id}  {first.name}")
+        for item in cluster[1:]:
+            lines.append(f"    ~ {item.id}  {item.name}  (similarity {similarity(first.id, item.id):.2f})")
+    return "\n".join(lines)
+
+
+def corpus_items() -> list:
+    """DuaAmaal items and the segmented Common Acts duas, as one list."""
+    import glob
+    import json
+    import os
+    from contextlib import redirect_stdout
+
+    from generate_ramadan_data import segment_common_acts
+    from models import load_item
+
+    items = [load_item(Path(path)) for path in sorted(glob.glob(str(PROJECT_ROOT / "DuaAmaal" / "*.json")))]
+    with open(PROJECT_ROOT / "common_acts_ramadan.json", "r", encoding="utf-8") as f:
+        common_acts = json.load(f)["content"]["items"]
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        items.extend(segment_common_acts(common_acts))
+    return items
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Report near-duplicate duas in DuaAmaal/ and the Common Acts")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard similarity threshold (default: 0.8)")
+    parser.add_argument("--json", type=Path, help="Also write the clusters as JSON")
+    args = parser.parse_args()
+
+    items = corpus_items()
+    index = build_index(items, args.threshold)
+    by_id = {item.id: item for item in items}
+    clusters = [[by_id[doc_id] for doc_id in cluster] for cluster in index.clusters()]
+
+    def similarity(a, b):
+        return jaccard(index.shingles[a], index.shingles[b])
+
+    print(f"{len(items)} item(s), {len(index.candidates())} candidate pair(s) "
+          f"({index.bands} bands x {index.rows} rows)")
+    print(report(clusters, similarity))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([
+                [{"id": item.id, "name": item.name, "similarity": round(similarity(cluster[0].id, item.id), 4)}
+                 for item in cluster]
+                for cluster in clusters
+            ], f, indent=2, ensure_ascii=False)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
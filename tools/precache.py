@@ -0,0 +1,163 @@
+"""
+Offline precache manifest for the published data files.
+
+Reads the publish manifest (app/public/data/manifest.json, written by
+publish.py) and lists which files a service worker should fetch ahead of
+time so the app works offline, as ``{url, revision, size}`` entries.
+
+Files are taken in priority tiers: first the core data every page needs
+(schedule, calendar, footnotes, ...), then the item chunks by level, since
+levels are cumulative and everyone sees level 1 ("Essential") while only
+some users go on to level 2 ("Striver") and 3 ("Wayfarer"). ``max_level``
+selects the last level tier worth precaching; items above it are always
+deferred.
+
+Files are added in tier order, smallest first within a tier, while they
+fit the size budget. A file that does not fit is deferred and the next one
+is tried, so the budget left over after an oversized file (a large day
+schedule, say) still goes to the following tiers. This never costs a higher-priority file its place:
+every file of an earlier tier has already been considered, and a skipped
+one could not have used the remaining budget. Deferred files are listed
+separately and can be cached on first use instead.
+
+publish.py writes the precache manifest together with the publish
+manifest, so it always describes the files just published.
+
+Usage:
+    python tools/precache.py                   # rewrite it for the current publish manifest
+    python tools/precache.py --budget 512      # budget in KiB
+    python tools/precache.py --max-level 1     # only Essential items
+"""
+
+import json
+import re
+from pathlib import Path
+
+from publish import DATA_DIR, MANIFEST_NAME, PUBLIC_DIR
+from ts_emitter import AtomicWriter
+
+PRECACHE_NAME = "precache.json"
+PRECACHE_VERSION = 1
+DEFAULT_BUDGET = 2 * 1024 * 1024
+# URL prefix of the published files, relative to the app (vite base is './')
+BASE_URL = "data/"
+
+CORE_TIER = 0
+TIER_LABELS = {CORE_TIER: "core", 1: "essential", 2: "striver", 3: "wayfarer"}
+
+# Phrase pages of a paged item chunk: items/<chunk>.p<N>.json
+PAGE_RE = re.compile(r"^(?P<chunk>.+)\.p\d+\.json$")
+
+
+def item_level(logical: str, data_dir: Path = DATA_DIR) -> int | None:
+    """Level of the item an ``items/`` chunk or phrase page belongs to; None for other files."""
+    if not logical.startswith("items/") or not logical.endswith(".json"):
+        return None
+    match = PAGE_RE.match(logical)
+    chunk = f"{match['chunk']}.json" if match else logical
+    try:
+        with open(data_dir / chunk, "r", encoding="utf-8") as f:
+            level = json.load(f).get("level", 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+    return level if level in TIER_LABELS else max(TIER_LABELS)
+
+
+def tier_of(logical: str, data_dir: Path = DATA_DIR) -> int:
+    level = item_level(logical, data_dir)
+    return CORE_TIER if level is None else level
+
+
+def build_precache(manifest: dict, budget: int = DEFAULT_BUDGET, data_dir: Path = DATA_DIR,
+                   base_url: str = BASE_URL, max_level: int = max(TIER_LABELS)) -> dict:
+    """The precache manifest for a publish ``manifest``: tiers up to ``max_level``, within ``budget`` bytes."""
+    if max_level not in TIER_LABELS or max_level == CORE_TIER:
+        raise ValueError(f"max_level must be between 1 and {max(TIER_LABELS)}, got {max_level!r}")
+    # Smallest first within a tier, so a tight budget covers as many files as it can
+    entries = sorted(
+        (tier_of(logical, data_dir), info["size"], logical, info) for logical, info in manifest["files"].items()
+    )
+    included, deferred = [], []
+    total = 0
+    for tier, _, logical, info in entries:
+        entry = {
+            "url": base_url + info["file"],
+            "revision": info["sha256"][:16],
+            "size": info["size"],
+            "tier": tier,
+        }
+        if tier <= max_level and total + info["size"] <= budget:
+            included.append(entry)
+            total += info["size"]
+        else:
+            deferred.append(entry)
+
+    tiers = []
+    for tier, label in TIER_LABELS.items():
+        members = [entry for entry in included if entry["tier"] == tier]
+        tiers.append({
+            "tier": tier,
+            "label": label,
+            "files": len(members),
+            "size": sum(entry["size"] for entry in members),
+            "deferred": sum(entry["tier"] == tier for entry in deferred),
+        })
+    return {
+        "version": PRECACHE_VERSION,
+        "budget": budget,
+        "maxLevel": max_level,
+        "size": total,
+        "tiers": tiers,
+        "entries": included,
+        "deferred": deferred,
+    }
+
+
+def write_precache(precache: dict, out_dir: Path = PUBLIC_DIR) -> bool:
+    writer = AtomicWriter(Path(out_dir) / PRECACHE_NAME)
+    with writer as f:
+        json.dump(precache, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return writer.changed
+
+
+def add_arguments(parser):
+    """The precache options, shared with publish.py and generate_data.py --publish."""
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET // 1024, metavar="KIB",
+                        help=f"Precache size budget in KiB (default: {DEFAULT_BUDGET // 1024})")
+    parser.add_argument("--max-level", type=int, choices=[1, 2, 3], default=max(TIER_LABELS),
+                        help="Precache items up to this level (1 Essential, 2 Striver, 3 Wayfarer; default: 3)")
+
+
+def print_summary(precache: dict, path: Path, changed: bool):
+    print(f"Precache: {len(precache['entries'])} file(s), {precache['size'] / 1024:.1f} of "
+          f"{precache['budget'] / 1024:.0f} KiB budget; {len(precache['deferred'])} deferred")
+    for tier in precache["tiers"]:
+        deferred = f"  ({tier['deferred']} deferred)" if tier["deferred"] else ""
+        print(f"  {tier['tier']} {tier['label']:<10} {tier['files']:>4} file(s) {tier['size'] / 1024:>8.1f} KiB{deferred}")
+    print(f"{path} {'updated' if changed else 'unchanged'}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the offline precache manifest for the published data")
+    add_arguments(parser)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory of the generated JSON files")
+    parser.add_argument("--out", type=Path, default=PUBLIC_DIR, help="Published data directory (default: app/public/data)")
+    args = parser.parse_args()
+
+    manifest_path = args.out / MANIFEST_NAME
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        parser.error(f"{manifest_path} not found; run tools/publish.py first")
+
+    precache = build_precache(manifest, args.budget * 1024, args.data_dir, max_level=args.max_level)
+    changed = write_precache(precache, args.out)
+    print_summary(precache, args.out / PRECACHE_NAME, changed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Publish stage: copy the generated data files into the app's static output
+under content-addressed names.
+
+Each JSON file under app/src/data (day_schedule.json, footnotes.json,
+search_index.json, the --split item chunks, ...) is written to
+app/public/data/ as ``<stem>.<hash><suffix>``, where the hash is taken from
+its content. Because a name changes whenever the content does, the files
+can be cached forever; app/firebase.json serves them with
+``Cache-Control: public, max-age=31536000, immutable``, and leaves /data/ out
+of the SPA rewrite so a missing file is a 404 rather than a cached index.html.
+No precompressed copies are written: Firebase Hosting compresses responses
+itself and would not serve ``.gz``/``.br`` siblings as encodings.
+
+``manifest.json`` maps each logical name to its published file, hash and
+size. It is the only file that must be revalidated (``no-cache``), and it
+is written after the files it points to and before stale ones are removed,
+so a client never sees it reference a missing file. The offline precache
+manifest (precache.py) is written from it at the same point, so the two
+never drift apart.
+
+Usage:
+    python tools/publish.py              # publish into app/public/data/
+    python tools/publish.py --no-prune   # keep files of earlier versions
+    python tools/publish.py --budget 512 --max-level 1   # precache options, see precache.py
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Iterable
+
+from ts_emitter import AtomicWriter
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "app" / "src" / "data"
+PUBLIC_DIR = PROJECT_ROOT / "app" / "public" / "data"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+# Hex digits of the SHA-256 kept in file names
+HASH_LENGTH = 10
+# Published (content-hashed) files, and the .gz/.br siblings earlier versions
+# wrote next to them; only these are pruned
+HASHED_RE = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.[^.]+(?:\.gz|\.br)?$")
+
+
+def hashed_name(logical: str, digest: str) -> str:
+    """``items/dua.json`` -> ``items/dua.<hash>.json``."""
+    path = Path(logical)
+    return str(path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}").as_posix())
+
+
+def data_files(data_dir: Path = DATA_DIR) -> list[tuple[str, Path]]:
+    """``(logical name, path)`` of every JSON data file, sorted."""
+    return sorted((path.relative_to(data_dir).as_posix(), path) for path in data_dir.rglob("*.json"))
+
+
+def write_bytes(path: Path, data: bytes) -> bool:
+    writer = AtomicWriter(path, binary=True)
+    with writer as f:
+        f.write(data)
+    return writer.changed
+
+
+def publish(files: Iterable[tuple[str, Path]], out_dir: Path = PUBLIC_DIR, prune: bool = True,
+            precache_options: dict | None = None, data_dir: Path = DATA_DIR) -> dict:
+    """
+    Publish ``files`` into ``out_dir`` and write the manifest. Files already
+    published under the same hash are not rewritten. With ``precache_options``
+    (build_precache keyword arguments) the precache manifest is written too.
+    Returns the manifest, with counts of written and removed files under
+    ``"stats"`` and the precache manifest under ``"precache"``.
+    """
+    out_dir = Path(out_dir)
+    entries = {}
+    written = 0
+    for logical, path in files:
+        data = Path(path).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        name = hashed_name(logical, digest)
+        target = out_dir / name
+        if not target.exists():
+            written += write_bytes(target, data)
+        entries[logical] = {"file": name, "sha256": digest, "size": len(data)}
+
+    manifest = {"version": MANIFEST_VERSION, "files": entries}
+    writer = AtomicWriter(out_dir / MANIFEST_NAME)
+    with writer as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+    precache = None
+    precache_changed = False
+    if precache_options is not None:
+        # Imported here: precache.py builds on this module's paths
+        from precache import build_precache, write_precache
+
+        precache = build_precache(manifest, data_dir=data_dir, **precache_options)
+        precache_changed = write_precache(precache, out_dir)
+
+    removed = 0
+    if prune:
+        keep = {entry["file"] for entry in entries.values()}
+        for path in sorted(out_dir.rglob("*")):
+            if (path.is_file() and HASHED_RE.search(path.name)
+                    and path.relative_to(out_dir).as_posix() not in keep):
+                path.unlink()
+                removed += 1
+    return {**manifest, "precache": precache,
+            "stats": {"written": written, "removed": removed, "manifest_changed": writer.changed,
+                      "precache_changed": precache_changed}}
+
+
+def publish_data(data_dir: Path = DATA_DIR, out_dir: Path = PUBLIC_DIR, prune: bool = True,
+                 budget_kib: int | None = None, max_level: int | None = None) -> dict:
+    """Publish every data file with its precache manifest and print a summary (publish.py, generate_data.py)."""
+    from precache import DEFAULT_BUDGET, PRECACHE_NAME, print_summary
+
+    options = {"budget": DEFAULT_BUDGET if budget_kib is None else budget_kib * 1024}
+    if max_level is not None:
+        options["max_level"] = max_level
+    result = publish(data_files(data_dir), out_dir, prune, options, data_dir)
+    files = result["files"].values()
+    stats = result["stats"]
+    total = sum(entry["size"] for entry in files)
+    print(f"Published {len(result['files'])} file(s) to {out_dir}: {total / 1024:.1f} KiB")
+    print(f"{stats['written']} file(s) written, {stats['removed']} removed, "
+          f"manifest {'updated' if stats['manifest_changed'] else 'unchanged'}")
+    print_summary(result["precache"], Path(out_dir) / PRECACHE_NAME, stats["precache_changed"])
+    return result
+
+
+def main():
+    import argparse
+
+    from precache import add_arguments
+
+    parser = argparse.ArgumentParser(description="Publish the generated data files with content-hashed names")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory of the generated JSON files")
+    parser.add_argument("--out", type=Path, default=PUBLIC_DIR, help="Output directory (default: app/public/data)")
+    parser.add_argument("--no-prune", action="store_true", help="Keep published files no longer in the manifest")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    publish_data(args.data_dir, args.out, not args.no_prune, args.budget, args.max_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Precomputed day -> item schedule for the 30 days of Ramadan.
+
+The app filters every item by ``applicableDays`` and level whenever a day
+is selected. This module does that work once at build time: for each
+cumulative level (items with ``level <= L``, matching the app's
+``maxLevel``) it stores the ordered item ids for every day, so switching
+days is a plain lookup. The index is written as JSON so the app and the
+Python tooling read the same file.
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable
+
+from ts_emitter import AtomicWriter
+
+DAYS_IN_MONTH = 30
+LEVELS = (1, 2, 3)
+
+
+def load_content_order(project_root: Path) -> list[str]:
+    """Load app/src/data/content_order.json, or an empty order if missing."""
+    order_path = Path(project_root) / "app/src/data/content_order.json"
+    try:
+        with open(order_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def order_key(content_order: list[str]):
+    """Sort key: content_order.json position, then level, then id."""
+    positions = {item_id: i for i, item_id in enumerate(content_order)}
+    return lambda item: (positions.get(item["id"], len(positions)), item.get("level", 1), item["id"])
+
+
+def applicable_days(item: dict) -> list[int] | None:
+    """Return the item's days within 1-30, or None if it applies to every day."""
+    days = item.get("applicableDays", "all")
+    if days == "all" or not isinstance(days, list):
+        return None
+    return sorted({d for d in days if isinstance(d, int) and 1 <= d <= DAYS_IN_MONTH})
+
+
+class ScheduleIndex:
+    """Ordered item ids per day and cumulative level."""
+
+    def __init__(self, general: dict, days: dict, day_specific: dict):
+        self.general = general
+        self.days = days
+        self.day_specific = day_specific
+
+    @classmethod
+    def from_items(cls, items: Iterable[dict], content_order: list[str] | None = None) -> "ScheduleIndex":
+        ordered = sorted(items, key=order_key(content_order or []))
+
+        general = {level: [] for level in LEVELS}
+        days = {level: [[] for _ in range(DAYS_IN_MONTH)] for level in LEVELS}
+        day_specific = {level: [[] for _ in range(DAYS_IN_MONTH)] for level in LEVELS}
+
+        for item in ordered:
+            item_days = applicable_days(item)
+            for level in LEVELS:
+                if item.get("level", 1) > level:
+                    continue
+                if item_days is None:
+                    general[level].append(item["id"])
+                    for day_ids in days[level]:
+                        day_ids.append(item["id"])
+                else:
+                    for day in item_days:
+                        days[level][day - 1].append(item["id"])
+                        day_specific[level][day - 1].append(item["id"])
+
+        return cls(general, days, day_specific)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScheduleIndex":
+        def levels(table):
+            return {int(level): value for level, value in table.items()}
+
+        return cls(levels(data["general"]), levels(data["days"]), levels(data["daySpecific"]))
+
+    @classmethod
+    def load(cls, path: Path) -> "ScheduleIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> dict:
+        """
+        Serialisable form: ``general[level]`` is a list of ids, while
+        ``days[level]`` and ``daySpecific[level]`` are indexed by ``day - 1``.
+        """
+        return {"general": self.general, "days": self.days, "daySpecific": self.day_specific}
+
+    @staticmethod
+    def _check(day: int | None, max_level: int):
+        # day - 1 would otherwise wrap around (day 0 is day 30) instead of failing
+        if max_level not in LEVELS:
+            raise ValueError(f"max_level must be one of {LEVELS}, got {max_level!r}")
+        if day is not None and not (isinstance(day, int) and 1 <= day <= DAYS_IN_MONTH):
+            raise ValueError(f"day must be between 1 and {DAYS_IN_MONTH}, got {day!r}")
+
+    def items_for_day(self, day: int | None, max_level: int = 3) -> list[str]:
+        """Item ids shown for ``day`` (None = general practices only), in display order."""
+        self._check(day, max_level)
+        if day is None:
+            return self.general[max_level]
+        return self.days[max_level][day - 1]
+
+    def day_specific_items(self, day: int, max_level: int = 3) -> list[str]:
+        """Item ids that apply to ``day`` specifically (not to every day)."""
+        if day is None:
+            raise ValueError(f"day must be between 1 and {DAYS_IN_MONTH}, got None")
+        self._check(day, max_level)
+        return self.day_specific[max_level][day - 1]
+
+    def days_for_item(self, item_id: str, max_level: int = 3) -> list[int]:
+        """Days on which ``item_id`` is scheduled."""
+        self._check(None, max_level)
+        return [day for day, ids in enumerate(self.days[max_level], start=1) if item_id in ids]
+
+    def write_json(self, path: Path) -> bool:
+        """Write the index as compact JSON (importable by the app). Returns True if changed."""
+        writer = AtomicWriter(path)
+        with writer as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        return writer.changed
@@ -0,0 +1,365 @@
+"""
+Schema validation for the DuaAmaal source files.
+
+``ITEM_SCHEMA`` describes a DuaAmaal/*.json document in a small subset of
+JSON Schema (type, const, pattern, minLength, minimum/maximum, anyOf,
+required, properties, items). It is compiled once, at import, into nested
+closures, so validating a document is a walk over plain function calls
+with no schema interpretation per value.
+
+Besides the per-document schema, the corpus as a whole is checked:
+
+  - item ids (``id``, or the file stem when absent) are unique;
+  - every id listed in app/src/data/content_order.json exists.
+
+Per-file results are cached by content hash (tools/.cache/schema.json),
+so only edited files are re-validated, and files can be validated in
+parallel worker processes. Problems are reported with the file, the JSON
+pointer of the offending value and what was expected, and
+generate_data.py refuses to build while there are any.
+
+Usage:
+    python tools/schema.py            # validate DuaAmaal/ and content_order.json
+    python tools/schema.py -j 4       # in 4 worker processes
+"""
+
+import glob
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from build_cache import CACHE_DIR, BuildCache
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DUA_AMAAL_DIR = PROJECT_ROOT / "DuaAmaal"
+CONTENT_ORDER_PATH = PROJECT_ROOT / "app" / "src" / "data" / "content_order.json"
+CACHE_PATH = CACHE_DIR / "schema.json"
+
+# Bump when ITEM_SCHEMA changes so cached results are discarded
+SCHEMA_VERSION = "1"
+
+STRING = {"type": "string"}
+# Preambles and postambles are plain text or {arabic, english}
+AMBLE = {"anyOf": [
+    {"type": "null"},
+    STRING,
+    {
+        "type": "object",
+        "required": ["english"],
+        "properties": {"arabic": STRING, "english": STRING, "transliteration": STRING},
+    },
+]}
+
+ITEM_SCHEMA = {
+    "type": "object",
+    "required": ["title", "phrases"],
+    "properties": {
+        "id": {"type": "string", "minLength": 1},
+        "title": {"type": "string", "minLength": 1},
+        "arabic_title": STRING,
+        "description": STRING,
+        "content_type": STRING,
+        "source": STRING,
+        "level": {"anyOf": [
+            {"type": "string", "pattern": r"^L[1-3]$"},
+            {"type": "integer", "minimum": 1, "maximum": 3},
+        ]},
+        "applicable_days": {"anyOf": [
+            {"type": "null"},
+            {"const": "all"},
+            {"type": "array", "items": {"type": "integer", "minimum": 1, "maximum": 30}},
+        ]},
+        "preamble": AMBLE,
+        "postamble": AMBLE,
+        "instructions": {"type": "array", "items": STRING},
+        "phrases": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["arabic", "english"],
+                "properties": {"arabic": STRING, "english": STRING, "transliteration": STRING},
+            },
+        },
+    },
+}
+
+
+class Problem(NamedTuple):
+    file: str
+    pointer: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.file}: {self.pointer or '/'}: {self.message}"
+
+
+# -- Schema compiler ------------------------------------------------------------
+
+Validator = Callable[[Any, str], list[tuple[str, str]]]
+
+TYPE_CHECKS = {
+    "null": lambda value: value is None,
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+}
+
+
+def describe(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return f"number {value!r}"
+    if isinstance(value, str):
+        return f"string {value[:40]!r}"
+    return type(value).__name__.replace("dict", "object").replace("list", "array")
+
+
+def escape_pointer(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def compile_schema(schema: dict) -> Validator:
+    """Compile ``schema`` into a function returning ``[(pointer, message)]`` for a value."""
+    checks: list[Validator] = []
+
+    if "anyOf" in schema:
+        options = [compile_schema(option) for option in schema["anyOf"]]
+        summary = " or ".join(schema_summary(option) for option in schema["anyOf"])
+
+        def any_of(value, pointer):
+            results = [option(value, pointer) for option in options]
+            if all(results):
+                # Report the closest option if exactly one got past its type check
+                typed = [r for r, option in zip(results, schema["anyOf"]) if not type_mismatch(option, value)]
+                return typed[0] if len(typed) == 1 else [(pointer, f"expected {summary}, got {describe(value)}")]
+            return []
+        checks.append(any_of)
+
+    if "type" in schema:
+        type_name = schema["type"]
+        is_type = TYPE_CHECKS[type_name]
+
+        def check_type(value, pointer):
+            return [] if is_type(value) else [(pointer, f"expected {type_name}, got {describe(value)}")]
+        checks.append(check_type)
+
+    if "const" in schema:
+        const = schema["const"]
+        checks.append(lambda value, pointer: [] if value == const else [(pointer, f"expected {const!r}, got {describe(value)}")])
+
+    if "pattern" in schema:
+        regex = re.compile(schema["pattern"])
+        checks.append(lambda value, pointer: [] if not isinstance(value, str) or regex.search(value)
+                      else [(pointer, f"{value!r} does not match {schema['pattern']}")])
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+        checks.append(lambda value, pointer: [] if not isinstance(value, str) or len(value) >= min_length
+                      else [(pointer, f"must be at least {min_length} character(s)")])
+
+    if "minimum" in schema or "maximum" in schema:
+        low, high = schema.get("minimum"), schema.get("maximum")
+
+        def check_range(value, pointer):
+            if not TYPE_CHECKS["integer"](value):
+                return []
+            if (low is not None and value < low) or (high is not None and value > high):
+                return [(pointer, f"{value} is out of range {low}-{high}")]
+            return []
+        checks.append(check_range)
+
+    if "required" in schema:
+        required = schema["required"]
+        checks.append(lambda value, pointer: [] if not isinstance(value, dict) else [
+            (pointer, f"missing required field {key!r}") for key in required if key not in value
+        ])
+
+    if "properties" in schema:
+        properties = {key: compile_schema(sub) for key, sub in schema["properties"].items()}
+
+        def check_properties(value, pointer):
+            if not isinstance(value, dict):
+                return []
+            problems = []
+            for key, validator in properties.items():
+                if key in value:
+                    problems.extend(validator(value[key], f"{pointer}/{escape_pointer(key)}"))
+            return problems
+        checks.append(check_properties)
+
+    if "items" in schema:
+        item_validator = compile_schema(schema["items"])
+
+        def check_items(value, pointer):
+            if not isinstance(value, list):
+                return []
+            problems = []
+            for i, item in enumerate(value):
+                problems.extend(item_validator(item, f"{pointer}/{i}"))
+            return problems
+        checks.append(check_items)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value, pointer):
+        problems = []
+        for check in checks:
+            found = check(value, pointer)
+            if found:
+                problems.extend(found)
+                # Once the type is wrong, the remaining checks have nothing to say
+                if check is checks[0] and ("type" in schema or "anyOf" in schema):
+                    break
+        return problems
+    return validate
+
+
+def schema_summary(schema: dict) -> str:
+    if "const" in schema:
+        return repr(schema["const"])
+    if "pattern" in schema:
+        return f"{schema['type']} matching {schema['pattern']}"
+    if "minimum" in schema or "maximum" in schema:
+        return f"{schema['type']} {schema.get('minimum')}-{schema.get('maximum')}"
+    if schema.get("type") == "array" and "items" in schema:
+        return f"array of {schema_summary(schema['items'])}"
+    return schema.get("type", "value")
+
+
+def type_mismatch(schema: dict, value: Any) -> bool:
+    if "const" in schema:
+        return value != schema["const"]
+    return "type" in schema and not TYPE_CHECKS[schema["type"]](value)
+
+
+validate_item = compile_schema(ITEM_SCHEMA)
+
+
+# -- Files and corpus -------------------------------------------------------------
+
+def validate_file(json_file: str) -> dict:
+    """
+    Validate one DuaAmaal file. Runs in a worker process with ``jobs``, so
+    the result is plain data: ``{"file", "id", "problems": [[pointer, message]]}``.
+    """
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        return {"file": json_file, "id": None, "problems": [["", f"invalid JSON at line {e.lineno} column {e.colno}: {e.msg}"]]}
+    except (OSError, UnicodeDecodeError) as e:
+        return {"file": json_file, "id": None, "problems": [["", f"{type(e).__name__}: {e}"]]}
+    item_id = data.get("id", Path(json_file).stem) if isinstance(data, dict) else None
+    return {"file": json_file, "id": item_id if isinstance(item_id, str) else None,
+            "problems": [list(problem) for problem in validate_item(data, "")]}
+
+
+class ValidationReport:
+    def __init__(self, files: int, problems: list[Problem], cache_hits: int = 0):
+        self.files = files
+        self.problems = problems
+        self.cache_hits = cache_hits
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def format(self) -> str:
+        if self.ok:
+            return f"Schema: {self.files} file(s) valid ({self.cache_hits} cached)"
+        lines = [f"Schema: {len(self.problems)} problem(s) in {self.files} file(s):"]
+        lines.extend(f"  {problem}" for problem in self.problems)
+        return "\n".join(lines)
+
+
+def validate_corpus(json_files: list[str], content_order_path: Path | None = CONTENT_ORDER_PATH,
+                    jobs: int = 1, use_cache: bool = True) -> ValidationReport:
+    """Validate every file against ITEM_SCHEMA, then the cross-file rules."""
+    cache = BuildCache(CACHE_PATH, salt=SCHEMA_VERSION)
+    if not use_cache:
+        cache.entries = {}
+
+    results = {}
+    pending = {}
+    for json_file in json_files:
+        try:
+            cached, fingerprint = cache.lookup(json_file)
+        except OSError as e:
+            results[json_file] = {"file": json_file, "id": None, "problems": [["", f"{type(e).__name__}: {e}"]]}
+            continue
+        if cached is None:
+            pending[json_file] = fingerprint
+        else:
+            results[json_file] = {"file": json_file, **cached}
+
+    if jobs > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            fresh = list(executor.map(validate_file, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+    else:
+        fresh = [validate_file(json_file) for json_file in pending]
+    for result in fresh:
+        cache.store(result["file"], pending[result["file"]], {"id": result["id"], "problems": result["problems"]})
+        results[result["file"]] = result
+    cache.prune({Path(p).name for p in json_files})
+    cache.save()
+
+    problems = []
+    owners: dict[str, list[str]] = {}
+    for json_file in json_files:
+        result = results[json_file]
+        name = Path(json_file).name
+        problems.extend(Problem(name, pointer, message) for pointer, message in result["problems"])
+        if result["id"] is not None:
+            owners.setdefault(result["id"], []).append(name)
+
+    for item_id, names in owners.items():
+        # The first file keeps the id; every other owner is a problem of its own
+        for name in names[1:]:
+            problems.append(Problem(name, "/id", f"id {item_id!r} is already used by {names[0]}"))
+
+    if content_order_path is not None and Path(content_order_path).exists():
+        problems.extend(validate_content_order(Path(content_order_path), set(owners)))
+
+    return ValidationReport(len(json_files), problems, cache.hits)
+
+
+def validate_content_order(path: Path, item_ids: set[str]) -> list[Problem]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            order = json.load(f)
+    except (OSError, ValueError) as e:
+        return [Problem(path.name, "", f"{type(e).__name__}: {e}")]
+    if not isinstance(order, list):
+        return [Problem(path.name, "", f"expected array, got {describe(order)}")]
+    return [
+        Problem(path.name, f"/{i}", f"unknown item id {item_id!r}")
+        for i, item_id in enumerate(order)
+        if item_id not in item_ids
+    ]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate DuaAmaal/*.json and content_order.json")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes (default: 1)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-validate every file")
+    args = parser.parse_args()
+
+    json_files = sorted(glob.glob(str(DUA_AMAAL_DIR / "*.json")))
+    report = validate_corpus(json_files, CONTENT_ORDER_PATH, args.jobs, use_cache=not args.no_cache)
+    print(report.format(), file=sys.stdout if report.ok else sys.stderr)
+    sys.exit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Full-text search index over the Ramadan corpus.
+
+Indexes the Arabic, English and transliteration text of DuaAmaal/*.json,
+common_acts_ramadan.json and shahr_ramadan_translated.json into a single
+positional inverted index, so both word and exact phrase queries are a few
+dictionary lookups and set intersections.
+
+Text is normalised before tokenising so that queries match regardless of
+diacritics:
+  - Arabic: tashkeel and tatweel are stripped, alef forms (أ إ آ ٱ) become ا,
+    ى/ی become ي, ة becomes ه, ؤ becomes و and ئ becomes ي.
+  - Latin: accents and macrons are folded (ā -> a, ḥ -> h), ayn/hamza marks
+    (ʿ ʾ ‘ ’ ') are dropped and everything is lower-cased.
+
+The serialised form (app/src/data/search_index.json) stores a document
+table and, per term, a flat integer list of delta-encoded postings:
+``[doc_delta, n_positions, pos_delta, ...]`` repeated for each document.
+
+Usage:
+    python tools/search_index.py                 # build and write the index
+    python tools/search_index.py --query iftitah  # build, then search
+"""
+
+import glob
+import json
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from ts_emitter import AtomicWriter
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DUA_AMAAL_DIR = PROJECT_ROOT / "DuaAmaal"
+COMMON_ACTS_PATH = PROJECT_ROOT / "common_acts_ramadan.json"
+TRANSLATED_PATH = PROJECT_ROOT / "shahr_ramadan_translated.json"
+OUTPUT_PATH = PROJECT_ROOT / "app" / "src" / "data" / "search_index.json"
+
+INDEX_VERSION = 1
+TEXT_FIELDS = ("arabic", "english", "transliteration")
+
+TASHKEEL_RE = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+ARABIC_FOLD = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ی": "ي", "ئ": "ي",
+    "ة": "ه",
+    "ؤ": "و",
+    "ک": "ك",
+})
+APOSTROPHES_RE = re.compile("[ʿʾʻʼ‘’'`]")
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalise(text: str) -> str:
+    """Fold Arabic and Latin text to the form used for indexing and querying."""
+    text = TASHKEEL_RE.sub("", text).translate(ARABIC_FOLD)
+    text = APOSTROPHES_RE.sub("", text)
+    # NFKD splits Latin letters from their accents; Arabic letters are unaffected
+    # because the alef/hamza forms were already folded above.
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(normalise(text))
+
+
+# -- Corpus walkers ----------------------------------------------------------
+
+def iter_dua_amaal_docs(dua_amaal_dir: Path = DUA_AMAAL_DIR) -> Iterator[tuple[list, dict]]:
+    """Yield ``(doc_ref, fields)`` for each DuaAmaal title block and phrase."""
+    for json_file in sorted(glob.glob(str(Path(dua_amaal_dir) / "*.json"))):
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        item_id = data.get("id", Path(json_file).stem)
+        title = data.get("title", "")
+        yield ["dua", item_id, None, title], {
+            "arabic": data.get("arabic_title", ""),
+            "english": f"{title}\n{data.get('description', '')}",
+        }
+        for n, phrase in enumerate(data.get("phrases", [])):
+            yield ["dua", item_id, n, title], phrase
+
+
+def iter_section_docs(source: str, section: dict) -> Iterator[tuple[list, dict]]:
+    """Yield text items (and their phrases) from a translated section tree."""
+    for item in section.get("items", []):
+        if not isinstance(item, dict):
+            continue
+        if "items" in item:
+            yield from iter_section_docs(source, item)
+            continue
+        label = item.get("custom_title") or section.get("title", "")
+        yield [source, item.get("id"), None, label], item
+        for n, phrase in enumerate(item.get("phrases") or []):
+            yield [source, item.get("id"), n, label], phrase
+
+
+def iter_corpus_docs() -> Iterator[tuple[list, dict]]:
+    yield from iter_dua_amaal_docs()
+    for source, path in (("common_acts", COMMON_ACTS_PATH), ("shahr_ramadan", TRANSLATED_PATH)):
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                yield from iter_section_docs(source, json.load(f).get("content", {}))
+
+
+# -- Index --------------------------------------------------------------------
+
+class SearchIndex:
+    """Positional inverted index: term -> {doc index: [positions]}."""
+
+    def __init__(self):
+        self.docs: list[list] = []
+        self.postings: dict[str, dict[int, list[int]]] = {}
+
+    @classmethod
+    def build(cls, docs: Iterable[tuple[list, dict]]) -> "SearchIndex":
+        index = cls()
+        for ref, fields in docs:
+            index.add(ref, fields)
+        return index
+
+    def add(self, ref: list, fields: dict):
+        doc = len(self.docs)
+        position = 0
+        for field in TEXT_FIELDS:
+            text = fields.get(field)
+            if not text:
+                continue
+            for token in tokenize(text):
+                self.postings.setdefault(token, {}).setdefault(doc, []).append(position)
+                position += 1
+            # Leave a gap so a phrase can never match across two fields
+            position += 1
+        if position:
+            self.docs.append(ref)
+
+    def search(self, query: str, limit: int | None = None) -> list[list]:
+        """Return doc refs containing ``query`` as a contiguous phrase."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return []
+
+        # Intersect starting from the rarest term
+        candidates = set(min(postings, key=len))
+        for term_postings in postings:
+            candidates.intersection_update(term_postings)
+
+        hits = []
+        for doc in sorted(candidates):
+            if len(terms) == 1 or self._has_phrase(doc, postings):
+                hits.append(self.docs[doc])
+                if limit and len(hits) >= limit:
+                    break
+        return hits
+
+    @staticmethod
+    def _has_phrase(doc: int, postings: list[dict[int, list[int]]]) -> bool:
+        following = [set(term_postings[doc]) for term_postings in postings[1:]]
+        return any(
+            all(start + offset in positions for offset, positions in enumerate(following, start=1))
+            for start in postings[0][doc]
+        )
+
+    # -- Serialisation --
+
+    def to_dict(self) -> dict:
+        terms = {}
+        for term in sorted(self.postings):
+            flat = []
+            last_doc = 0
+            for doc, positions in sorted(self.postings[term].items()):
+                flat.append(doc - last_doc)
+                flat.append(len(positions))
+                last_pos = 0
+                for pos in positions:
+                    flat.append(pos - last_pos)
+                    last_pos = pos
+                last_doc = doc
+            terms[term] = flat
+        return {"version": INDEX_VERSION, "docs": self.docs, "terms": terms}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SearchIndex":
+        index = cls()
+        index.docs = data["docs"]
+        for term, flat in data["terms"].items():
+            term_postings = {}
+            doc = 0
+            i = 0
+            while i < len(flat):
+                doc += flat[i]
+                count = flat[i + 1]
+                positions = []
+                pos = 0
+                for delta in flat[i + 2:i + 2 + count]:
+                    pos += delta
+                    positions.append(pos)
+                term_postings[doc] = positions
+                i += 2 + count
+            index.postings[term] = term_postings
+        return index
+
+    def write_json(self, path: Path) -> bool:
+        writer = AtomicWriter(path)
+        with writer as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        return writer.changed
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the full-text search index")
+    parser.add_argument("--query", "-q", action="append", default=[], help="Phrase to search for (repeatable)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = SearchIndex.build(iter_corpus_docs())
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {len(index.docs)} documents, {len(index.postings)} terms in {elapsed * 1000:.1f} ms")
+
+    if index.write_json(args.output):
+        print(f"Written to: {args.output}")
+
+    for query in args.query:
+        start = time.perf_counter()
+        hits = index.search(query)
+        elapsed = time.perf_counter() - start
+        print(f"\n{query!r}: {len(hits)} hit(s) in {elapsed * 1000:.3f} ms")
+        for source, item_id, phrase, label in hits[:10]:
+            suffix = f" #{phrase}" if phrase is not None else ""
+            print(f"  {source}:{item_id}{suffix}  {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Title -> JSON pointer index over a source document.
+
+Finding a section by title used to mean a recursive walk over every key
+and list element of the book (and a second walk to list titles on
+failure). This index is built once per source file and cached on disk next
+to it (``.<name>.titles.json``), keyed by the source's SHA-256 so it is
+rebuilt automatically when the source changes.
+
+Lookups go through dictionaries: exact matches hit a normalised-title map,
+and substring matches intersect a character-trigram map before verifying
+the few remaining candidates. Titles are normalised with the search
+index's folding (tashkeel, alef/ya/ta-marbuta variants, Latin accents and
+case), so queries do not have to reproduce the source's diacritics.
+
+Pointers are RFC 6901 JSON pointers (``/content/items/12/items/3``) and
+can be resolved against a loaded document with :func:`resolve`, or read
+straight from the file with :func:`load_pointer`, which streams the source
+and only builds the value the pointer names.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterator
+
+from build_cache import file_digest
+from json_stream import load_path
+from search_index import normalise
+
+INDEX_VERSION = 1
+TITLE_FIELDS = ("title", "title_english", "custom_title")
+# Footnote references carry a "title" too, but they are not sections
+SKIP_KEYS = {"footnote_refs", "footnotes"}
+
+
+def escape_token(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def unescape_token(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def iter_titles(node: Any, pointer: str = "") -> Iterator[tuple[str, str]]:
+    """Yield ``(title, pointer)`` for every titled object, in document order."""
+    if isinstance(node, dict):
+        for field in TITLE_FIELDS:
+            title = node.get(field)
+            if isinstance(title, str) and title.strip():
+                yield title, pointer
+        for key, value in node.items():
+            if key not in SKIP_KEYS and isinstance(value, (dict, list)):
+                yield from iter_titles(value, f"{pointer}/{escape_token(key)}")
+    elif isinstance(node, list):
+        for i, value in enumerate(node):
+            if isinstance(value, (dict, list)):
+                yield from iter_titles(value, f"{pointer}/{i}")
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TitleIndex:
+    """Exact and substring title lookups returning JSON pointers."""
+
+    def __init__(self, entries: list[list[str]]):
+        self.entries = entries
+        self.exact: dict[str, list[str]] = {}
+        self.normalised: list[str] = []
+        self.grams: dict[str, set[int]] = {}
+        for i, (title, pointer) in enumerate(entries):
+            key = normalise(title).strip()
+            self.normalised.append(key)
+            self.exact.setdefault(key, []).append(pointer)
+            for gram in trigrams(key):
+                self.grams.setdefault(gram, set()).add(i)
+
+    @classmethod
+    def build(cls, data: Any) -> "TitleIndex":
+        return cls([[title, pointer] for title, pointer in iter_titles(data)])
+
+    @classmethod
+    def for_source(cls, source_path: Path) -> "TitleIndex":
+        """Load the cached index for ``source_path``, rebuilding it if the source changed."""
+        source_path = Path(source_path)
+        cache_path = source_path.with_name(f".{source_path.stem}.titles.json")
+        digest = file_digest(source_path)
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == INDEX_VERSION and cached.get("sha256") == digest:
+                return cls(cached["entries"])
+        except (OSError, ValueError):
+            pass
+
+        with open(source_path, "r", encoding="utf-8") as f:
+            index = cls.build(json.load(f))
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "sha256": digest, "entries": index.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+        return index
+
+    def find(self, query: str, substring: bool = False) -> list[str]:
+        """Pointers whose title equals (or, with ``substring``, contains) ``query``, in document order."""
+        key = normalise(query).strip()
+        if not substring:
+            return list(self.exact.get(key, []))
+
+        query_grams = trigrams(key)
+        if query_grams:
+            candidates = set.intersection(*(self.grams.get(gram, set()) for gram in query_grams))
+        else:
+            # Too short for trigrams - fall back to checking every title
+            candidates = range(len(self.entries))
+        pointers = []
+        for i in sorted(candidates):
+            pointer = self.entries[i][1]
+            if key in self.normalised[i] and pointer not in pointers:
+                pointers.append(pointer)
+        return pointers
+
+    def find_first(self, query: str, substring: bool = False) -> str | None:
+        pointers = self.find(query, substring)
+        return pointers[0] if pointers else None
+
+    def titles(self) -> list[tuple[str, str]]:
+        """Every ``(title, pointer)`` pair, e.g. for listing sections when a lookup fails."""
+        return [(title, pointer) for title, pointer in self.entries]
+
+
+def split_pointer(pointer: str) -> list[str]:
+    if not pointer:
+        return []
+    return [unescape_token(token) for token in pointer.lstrip("/").split("/")]
+
+
+def resolve(data: Any, pointer: str) -> Any:
+    """Resolve a JSON pointer against an already loaded document."""
+    node = data
+    for token in split_pointer(pointer):
+        node = node[int(token)] if isinstance(node, list) else node[token]
+    return node
+
+
+def load_pointer(source_path: Path, pointer: str) -> Any:
+    """
+    Read the value at ``pointer`` from ``source_path`` without loading the
+    whole file: the stream is walked along the pointer, siblings are skipped
+    unbuilt, and only the named value is materialised.
+    """
+    with open(source_path, "rb") as f:
+        return load_path(f, split_pointer(pointer))
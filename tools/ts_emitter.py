@@ -0,0 +1,104 @@
+"""
+Streaming TypeScript emitter shared by the data generators.
+
+Modules are written chunk by chunk from generators, so a generator never
+has to hold the rendered module in memory. Output goes to a temporary file
+next to the target and is renamed into place only once it is complete; a
+crash mid-write therefore never leaves a truncated module behind for the
+dev server to pick up, and an unchanged module is not touched at all.
+"""
+
+import filecmp
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+
+def _current_umask() -> int:
+    # os.umask can only be read by setting it
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+class AtomicWriter:
+    """
+    Context manager that writes text (or bytes, with ``binary``) to a temp
+    file and renames it over ``path`` on success. ``changed`` is False
+    afterwards if the new content was byte-identical to the existing file
+    (which is then left untouched).
+    """
+
+    def __init__(self, path: Path, binary: bool = False):
+        self.path = Path(path)
+        self.binary = binary
+        self.changed = False
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+        if self.binary:
+            self._file = os.fdopen(fd, "wb")
+        else:
+            self._file = os.fdopen(fd, "w", encoding="utf-8", newline="\n")
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is not None:
+            os.unlink(self._tmp_path)
+            return False
+        if self.path.exists() and filecmp.cmp(self._tmp_path, self.path, shallow=False):
+            os.unlink(self._tmp_path)
+            return False
+        # mkstemp creates the file 0600; give it the mode the target has (or would get from open())
+        try:
+            mode = self.path.stat().st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_current_umask()
+        os.chmod(self._tmp_path, mode)
+        os.replace(self._tmp_path, self.path)
+        self.changed = True
+        return False
+
+
+def write_chunks(path: Path, chunks: Iterable[str]) -> bool:
+    """Atomically write an iterable of text chunks. Returns True if the file changed."""
+    writer = AtomicWriter(path)
+    with writer as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return writer.changed
+
+
+def write_lines(path: Path, lines: Iterable[str]) -> bool:
+    """Atomically write an iterable of lines (without trailing newlines)."""
+    return write_chunks(path, (line + "\n" for line in lines))
+
+
+def iter_json_array(records: Iterable[Any], indent: int = 2) -> Iterator[str]:
+    """
+    Yield a JSON array one record at a time.
+
+    The output is byte-identical to ``json.dumps(list(records), indent=indent,
+    ensure_ascii=False)``.
+    """
+    pad = " " * indent
+    first = True
+    for record in records:
+        body = json.dumps(record, indent=indent, ensure_ascii=False).replace("\n", "\n" + pad)
+        yield ("[\n" if first else ",\n") + pad + body
+        first = False
+    yield "[]" if first else "\n]"
+
+
+def iter_ts_const(name: str, ts_type: str, records: Iterable[Any],
+                  render: Callable[[Iterable[Any]], Iterator[str]] = iter_json_array) -> Iterator[str]:
+    """Yield ``export const name: ts_type = <records>;`` incrementally."""
+    yield f"export const {name}: {ts_type} = "
+    yield from render(records)
+    yield ";\n"